@@ -2,19 +2,25 @@ from flask import Flask
 from flask_cors import CORS
 from flask_sse import sse
 from flask_jwt_extended import JWTManager
-from sqlalchemy import text, inspect
+from sqlalchemy import event, text, inspect
 from database.models import db, Device
 from device_manager import DeviceManager
 from config import Config
-import serial.tools.list_ports
+from utils.ports import probe_candidates, probe_executor
+from utils.json_provider import ORJSONProvider
+from utils.sse_redis import use_shared_redis_pool
 import atexit
+import concurrent.futures
 import threading
+import time
 import os
 import sys
 
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = Config.SQLALCHEMY_ENGINE_OPTIONS
 app.config['REDIS_URL'] = Config.REDIS_URL
 app.config['JWT_SECRET_KEY'] = Config.JWT_SECRET_KEY
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = Config.JWT_ACCESS_TOKEN_EXPIRES
@@ -34,6 +40,27 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
 db.init_app(app)
 jwt = JWTManager(app)
 
+SQLITE_MMAP_SIZE = 128 * 1024 * 1024
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets the API read while handler threads are writing samples;
+    busy_timeout waits out the remaining writer/writer overlap instead of
+    failing with "database is locked"."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=5000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    # Reads go through the page cache mapping instead of read() syscalls
+    cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+    cursor.close()
+
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', _set_sqlite_pragmas)
+
 from utils.errors import init_error_handling
 init_error_handling(app)
 
@@ -52,14 +79,19 @@ register_cli(app)
 
 
 with app.app_context():
-    db.create_all()
+    # One reflection pass serves both steps below. create_all() would probe
+    # every table individually, so skip it once the schema is in place.
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    if not set(db.metadata.tables).issubset(existing_tables):
+        db.create_all()
 
     # Lightweight schema patching for deployments without alembic migrations.
+    # Tables create_all() just made already have every column.
     try:
-        inspector = inspect(db.engine)
         migration_statements = []
 
-        if inspector.has_table('samples'):
+        if 'samples' in existing_tables:
             existing_columns = {column['name'] for column in inspector.get_columns('samples')}
             dialect_name = db.engine.dialect.name
             binary_type = 'BYTEA' if dialect_name == 'postgresql' else 'BLOB'
@@ -71,35 +103,55 @@ with app.app_context():
             if 'sample_image_filename' not in existing_columns:
                 migration_statements.append("ALTER TABLE samples ADD COLUMN sample_image_filename VARCHAR(255)")
 
-        if inspector.has_table('users'):
+        if 'users' in existing_tables:
             user_columns = {column['name'] for column in inspector.get_columns('users')}
             if 'time_display' not in user_columns:
                 migration_statements.append("ALTER TABLE users ADD COLUMN time_display VARCHAR(5) NOT NULL DEFAULT 'local'")
             if 'export_header_language' not in user_columns:
                 migration_statements.append("ALTER TABLE users ADD COLUMN export_header_language VARCHAR(5) NOT NULL DEFAULT 'en'")
 
-        if inspector.has_table('chimera_configurations'):
+        if 'chimera_configurations' in existing_tables:
             chimera_config_columns = {column['name'] for column in inspector.get_columns('chimera_configurations')}
             if 'recirculation_duration_seconds' not in chimera_config_columns:
                 migration_statements.append("ALTER TABLE chimera_configurations ADD COLUMN recirculation_duration_seconds INTEGER")
 
-        if migration_statements:
+        if 'tests' in existing_tables:
+            test_columns = {column['name'] for column in inspector.get_columns('tests')}
+            if 'data_revision' not in test_columns:
+                migration_statements.append("ALTER TABLE tests ADD COLUMN data_revision INTEGER NOT NULL DEFAULT 0")
+
+        # create_all() never touches existing tables, so indexes declared on
+        # a model after its table was created are added here.
+        missing_indexes = []
+        for table in db.metadata.sorted_tables:
+            if table.indexes and table.name in existing_tables:
+                index_names = {index['name'] for index in inspector.get_indexes(table.name)}
+                missing_indexes.extend(index for index in table.indexes if index.name not in index_names)
+
+        if migration_statements or missing_indexes:
             with db.engine.begin() as connection:
                 for statement in migration_statements:
                     connection.execute(text(statement))
+                for index in missing_indexes:
+                    index.create(connection)
     except Exception as exc:
         print(f"[DB MIGRATION] Failed to patch schema: {exc}")
 
+# Scan back-off bounds, and how often a connected Chimera is checked on.
+AUTO_CONNECT_MIN_DELAY = 5
+AUTO_CONNECT_MAX_DELAY = 60
+AUTO_CONNECT_WATCH_INTERVAL = 30
+
+
 def auto_connect_devices():
-    """Auto-scan and connect to devices on startup until a Chimera is found."""
-    import time
-    import concurrent.futures
+    """Scan for and connect devices until a Chimera is connected, then keep
+    watching it and resume scanning if it goes away."""
 
     time.sleep(2)
 
     # Reset stale connected flags from previous run (atexit may not have run)
     with app.app_context():
-        Device.query.update({Device.connected: False})
+        Device.mark_all_disconnected()
         db.session.commit()
 
     chimera_found = False
@@ -107,56 +159,79 @@ def auto_connect_devices():
     def check_port(port_info):
         nonlocal chimera_found
 
-        if 'Bluetooth' in port_info.device or 'Bluetooth' in port_info.description:
+        connected = device_manager.connect(port_info.device)
+        if not connected:
             return False
 
-        try:
-            connected = device_manager.connect(port_info.device)
-            if not connected:
-                return False
-
-            device = device_manager.get_device_by_port(port_info.device)
-            if device and hasattr(device, 'device_type'):
-                if device.device_type in ['chimera', 'chimera-max']:
-                    print(f'[AUTO-CONNECT] ✓ Connected to Chimera on {port_info.device}')
-                    chimera_found = True
-                    return True
-                if device.device_type in ['black-box', 'black_box']:
-                    print(f'[AUTO-CONNECT] ✓ Connected to BlackBox on {port_info.device}')
-                else:
-                    print(f'[AUTO-CONNECT] ✓ Connected to {device.device_type} on {port_info.device}')
-        except Exception:
-            pass
+        device = device_manager.get_device_by_port(port_info.device)
+        if device and hasattr(device, 'device_type'):
+            if device.device_type in ['chimera', 'chimera-max']:
+                print(f'[AUTO-CONNECT] ✓ Connected to Chimera on {port_info.device}')
+                chimera_found = True
+                return True
+            if device.device_type in ['black-box', 'black_box']:
+                print(f'[AUTO-CONNECT] ✓ Connected to BlackBox on {port_info.device}')
+            else:
+                print(f'[AUTO-CONNECT] ✓ Connected to {device.device_type} on {port_info.device}')
 
         return False
 
     # Back off between scans so BlackBox-only or bench setups don't probe
     # serial ports every 5s forever, competing with user-initiated connects.
-    retry_delay = 5
-    max_retry_delay = 60
+    retry_delay = AUTO_CONNECT_MIN_DELAY
+
+    executor = probe_executor()
+
+    while True:
+        # While a Chimera is connected there is nothing to scan for; just
+        # notice when it disconnects (unplugged, power cycled, ...).
+        if device_manager.has_active_chimera():
+            if chimera_found:
+                print('[AUTO-CONNECT] Chimera connected, watching for disconnects')
+                chimera_found = False
+            retry_delay = AUTO_CONNECT_MIN_DELAY
+            time.sleep(AUTO_CONNECT_WATCH_INTERVAL)
+            continue
+
+        # Nothing plugged in: skip the probe pool and just back off
+        try:
+            ports = probe_candidates()
+        except Exception as exc:
+            print(f'[AUTO-CONNECT] Failed to list serial ports: {exc}')
+            ports = []
+        if not ports:
+            print(f'[AUTO-CONNECT] No serial ports found, retrying in {retry_delay} seconds...')
+            time.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, AUTO_CONNECT_MAX_DELAY)
+            continue
 
-    while not chimera_found:
         print('[AUTO-CONNECT] Scanning for Chimera device...')
 
         with app.app_context():
             try:
-                ports = list(serial.tools.list_ports.comports())
-                max_workers = min(8, len(ports) or 1)
-                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    executor.map(check_port, ports)
-
-                if chimera_found:
-                    print('[AUTO-CONNECT] Chimera found, stopping scan')
-                else:
+                futures = {executor.submit(check_port, port): port for port in ports}
+                try:
+                    for future in concurrent.futures.as_completed(futures, timeout=10):
+                        try:
+                            if future.result():
+                                break
+                        except Exception as exc:
+                            print(f'[AUTO-CONNECT] Probe of {futures[future].device} failed: {exc}')
+                except concurrent.futures.TimeoutError:
+                    print('[AUTO-CONNECT] Timed out waiting for port probes')
+                finally:
+                    # Drop probes that have not started yet; the next scan retries them.
+                    for future in futures:
+                        future.cancel()
+
+                if not chimera_found:
                     print(f'[AUTO-CONNECT] No Chimera found, retrying in {retry_delay} seconds...')
             except Exception as exc:
                 print(f'[AUTO-CONNECT] Error during auto-connect: {exc}')
 
         if not chimera_found:
             time.sleep(retry_delay)
-            retry_delay = min(retry_delay * 2, max_retry_delay)
-
-    print('[AUTO-CONNECT] Device scan complete')
+            retry_delay = min(retry_delay * 2, AUTO_CONNECT_MAX_DELAY)
 
 
 def _should_start_auto_connect():
@@ -184,12 +259,8 @@ if _should_start_auto_connect():
     # flags of the still-running server's devices when they exited.
     @atexit.register
     def on_exit():
-        with app.app_context():
-            devices = db.session.query(Device).all()
-            for device in devices:
-                device.connected = False
-            db.session.commit()
-            db.session.close()
+        with app.app_context(), db.engine.begin() as connection:
+            Device.mark_all_disconnected(connection)
 
 
 from routes.auth import auth_bp
@@ -224,8 +295,13 @@ def _require_stream_token():
     return check_stream_token()
 
 
+use_shared_redis_pool()
 app.register_blueprint(sse, url_prefix='/stream')
 
+# Werkzeug compiles the URL matcher lazily on the first request; do it at
+# boot so the first dashboard load after a restart doesn't pay for it.
+app.url_map.update()
+
 
 if __name__ == '__main__':
     # Werkzeug's debugger allows remote code execution — never enable it
@@ -6,6 +6,7 @@ from typing import Optional, Dict, List, Tuple
 from flask import has_app_context, current_app
 from serial_handler import SerialHandler
 from database.models import ChannelConfiguration, db
+from utils.errors import logger
 
 class BlackBoxHandler(SerialHandler):
     _db_write_lock = threading.RLock()
@@ -601,7 +602,7 @@ class BlackBoxHandler(SerialHandler):
 
         if not self.app:
             if debug_log:
-                print("[DEBUG calculateEventLogTip] No app found - returning early")
+                logger.debug("[calculateEventLogTip] No app found - returning early")
             return
 
         autoflush_context = db.session.no_autoflush if (reprocess_mode and not commit_changes) else nullcontext()
@@ -689,13 +690,12 @@ class BlackBoxHandler(SerialHandler):
                     channelNum = tipData["channel_number"]  # 1-15 for database
                     channelIdx = channelNum - 1  # 0-14 for array access
                     if debug_log:
-                        print(f"[DEBUG calculateEventLogTip] channelNum: {channelNum} (DB), channelIdx: {channelIdx} (array)")
-                        print(f"[DEBUG calculateEventLogTip] setup['inUse'] = {setup['inUse']}")
-                        print(f"[DEBUG calculateEventLogTip] Checking if channel {channelIdx} is in use: {setup['inUse'][channelIdx] if channelIdx < len(setup['inUse']) else 'INDEX OUT OF BOUNDS'}")
+                        logger.debug("[calculateEventLogTip] channelNum: %s (DB), channelIdx: %s (array), setup['inUse'] = %s",
+                                     channelNum, channelIdx, setup['inUse'])
                     #If this channel should be logging
                     if setup["inUse"][channelIdx]:
                         if debug_log:
-                            print(f"[DEBUG calculateEventLogTip] Channel {channelNum} IS in use - processing tip")
+                            logger.debug("[calculateEventLogTip] Channel %s IS in use - processing tip", channelNum)
                         #Get the time, temperature and pressure
                         eventTime = tipData["seconds_elapsed"]
                         timestamp = tipData["timestamp"]
@@ -784,11 +784,11 @@ class BlackBoxHandler(SerialHandler):
                         # Update channel configuration
                         databaseRow = ChannelConfiguration.query.filter_by(test_id = self.test_id, device_id = self.id, channel_number = channelNum).first()
                         if debug_log:
-                            print(f"[DEBUG calculateEventLogTip] Query for config: test_id={self.test_id}, device_id={self.id}, channel_number={channelNum}")
-                            print(f"[DEBUG calculateEventLogTip] databaseRow found: {databaseRow is not None}")
+                            logger.debug("[calculateEventLogTip] Config for test_id=%s, device_id=%s, channel_number=%s found: %s",
+                                         self.test_id, self.id, channelNum, databaseRow is not None)
                         if not databaseRow:
                             if debug_log:
-                                print(f"[DEBUG calculateEventLogTip] Warning: No channel configuration found for test {self.test_id}, device {self.id}, channel {channelNum}")
+                                logger.debug("[calculateEventLogTip] No channel configuration found for test %s, device %s, channel %s", self.test_id, self.id, channelNum)
                             return ""
 
                         databaseRow.hourly_tips = hourlyTips
@@ -842,12 +842,13 @@ class BlackBoxHandler(SerialHandler):
                         if commit_changes:
                             db.session.commit()
                         if debug_log:
-                            print(f"[DEBUG calculateEventLogTip] SUCCESS: Event log saved! event_log.id={event_log.id}")
+                            logger.debug("[calculateEventLogTip] Event log saved, event_log.id=%s", event_log.id)
 
                         # Check for volume-based recirculation trigger using ChimeraConfiguration
                         if (not reprocess_mode) and chimera_config and chimera_channel_config and databaseRow.chimera_channel:
-                            print(f"[DEBUG Recirculation] Checking recirculation: mode={chimera_config.recirculation_mode}, threshold={chimera_channel_config.volume_threshold_ml}, chimera_channel={databaseRow.chimera_channel}")
-                            print(f"[DEBUG Recirculation] Current volume since last recirculation: {overall['volumeRecirculation'][channelIdx]:.2f}")
+                            logger.debug("[Recirculation] Checking recirculation: mode=%s, threshold=%s, chimera_channel=%s, volume since last=%.2f",
+                                         chimera_config.recirculation_mode, chimera_channel_config.volume_threshold_ml,
+                                         databaseRow.chimera_channel, overall['volumeRecirculation'][channelIdx])
 
                             if (chimera_config.recirculation_mode == 'volume' and
                                 chimera_channel_config.volume_threshold_ml):
@@ -861,13 +862,13 @@ class BlackBoxHandler(SerialHandler):
                                     from device_manager import DeviceManager
                                     dm = DeviceManager()  # Get singleton instance
                                     chimera_handler = None
-                                    print(f"[DEBUG Recirculation] Looking for Chimera handler in {len(dm._active_handlers)} active handlers")
+                                    logger.debug("[Recirculation] Looking for Chimera handler in %d active handlers", len(dm._active_handlers))
                                     for port, handler in dm._active_handlers.items():
-                                        print(f"[DEBUG Recirculation]   Checking handler: port={port}, type={handler.device_type}, test_id={getattr(handler, 'test_id', 'N/A')}")
+                                        logger.debug("[Recirculation]   Checking handler: port=%s, type=%s, test_id=%s", port, handler.device_type, getattr(handler, 'test_id', 'N/A'))
                                         if (handler.device_type in ['chimera', 'chimera-max'] and
                                             getattr(handler, 'test_id', None) == self.test_id):
                                             chimera_handler = handler
-                                            print(f"[DEBUG Recirculation]   Found matching Chimera handler!")
+                                            logger.debug("[Recirculation]   Found matching Chimera handler")
                                             break
 
                                     if chimera_handler:
@@ -876,7 +877,7 @@ class BlackBoxHandler(SerialHandler):
                                             recirculation_duration = int(chimera_channel_config.volume_since_last_recirculation / 2.5)
                                             recirculation_pump_power = 100
 
-                                            print(f"[DEBUG Recirculation] Calling recirculate_flag(channel={databaseRow.chimera_channel}, duration={recirculation_duration}, pump_power={recirculation_pump_power})")
+                                            logger.debug("[Recirculation] Calling recirculate_flag(channel=%s, duration=%s, pump_power=%s)", databaseRow.chimera_channel, recirculation_duration, recirculation_pump_power)
                                             success, message = chimera_handler.recirculate_flag(
                                                 databaseRow.chimera_channel,
                                                 recirculation_duration,
@@ -902,11 +903,9 @@ class BlackBoxHandler(SerialHandler):
                         return result.format(*eventData)
                     else:
                         if debug_log:
-                            print(f"[DEBUG calculateEventLogTip] Channel {channelNum} is NOT in use - skipping tip processing")
+                            logger.debug("[calculateEventLogTip] Channel %s is NOT in use - skipping tip processing", channelNum)
             except:
-                import traceback
-                print("[DEBUG calculateEventLogTip] EXCEPTION occurred:")
-                traceback.print_exc()
+                logger.exception("[calculateEventLogTip] Failed to process tip")
                 return ""
 
             #Return correct information
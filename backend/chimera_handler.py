@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import Optional, Dict, List, Tuple
 from serial_handler import SerialHandler
 from utils import wifi_manager
+from utils.errors import logger
 
 
 class ChimeraHandler(SerialHandler):
@@ -419,7 +420,7 @@ class ChimeraHandler(SerialHandler):
         while True:
             response = self.get_response(timeout=5.0)
             if response:
-                print(f"[DEBUG] start_logging received: {response}")
+                logger.debug("[ChimeraHandler] start_logging received: %s", response)
             
             if not response:
                 return False, "Timeout waiting for start logging response"
@@ -60,6 +60,20 @@ def _persist_jwt_secret(env_path):
         print("Generated persistent JWT_SECRET_KEY in backend/.env")
         return secret
 
+def _engine_options(uri):
+    """Pool settings for the single gunicorn worker, its gevent greenlets and
+    the device handler threads, which all share one engine."""
+    options = {
+        'pool_pre_ping': True,  # survive Postgres restarts / dropped sockets
+        'pool_recycle': 1800,
+    }
+    # In-memory SQLite uses a per-thread pool that doesn't accept sizing.
+    if uri and ':memory:' not in uri:
+        options['pool_size'] = 10
+        options['max_overflow'] = 20
+    return options
+
+
 class Config:
     # Database configuration
     DB_NAME = os.getenv('DB_NAME')
@@ -78,6 +92,7 @@ class Config:
 
     # Other Flask-SQLAlchemy settings
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
     # JWT Configuration
     JWT_SECRET_KEY = _resolve_jwt_secret()
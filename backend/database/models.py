@@ -1,5 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, LargeBinary
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, LargeBinary, event, exists, inspect, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import DeclarativeBase, Session
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
@@ -9,6 +10,14 @@ class Base(DeclarativeBase):
 db = SQLAlchemy(model_class=Base)
 
 
+def insert_for(model):
+    """INSERT for `model` supporting on_conflict_do_nothing/do_update on the
+    configured backend (SQLite or PostgreSQL)."""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -60,11 +69,24 @@ class Device(db.Model):
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     device_type = Column(String(50), nullable=False)  # 'black_box' or 'chimera'
-    serial_port = Column(String(50), nullable=False)
+    serial_port = Column(String(50), nullable=False, index=True)  # DeviceManager looks devices up by port
     mac_address = Column(String(50), nullable=True, unique=True)  # Unique identifier
     connected = Column(Boolean, nullable=False, default=False)
     logging = Column(Boolean, nullable=False, default=False)
-    active_test_id = Column(Integer, ForeignKey('tests.id'), nullable=True)
+    active_test_id = Column(Integer, ForeignKey('tests.id'), nullable=True, index=True)
+
+    @classmethod
+    def mark_all_disconnected(cls, connection=None):
+        """Clear every connected flag in one UPDATE.
+
+        Runs on `connection` as plain Core when given (no session or unit of
+        work involved); otherwise through db.session, and the caller commits.
+        """
+        stmt = update(cls).values(connected=False)
+        if connection is not None:
+            connection.execute(stmt)
+        else:
+            db.session.execute(stmt.execution_options(synchronize_session=False))
 
 
 class BlackboxRawData(db.Model):
@@ -81,6 +103,11 @@ class BlackboxRawData(db.Model):
    temperature = Column(Float, nullable=True)
    pressure = Column(Float, nullable=True)
 
+   # Graph views, exports and the per-tip gap check read one test/device at a time
+   __table_args__ = (
+       db.Index('ix_blackbox_raw_test_device_ts', 'test_id', 'device_id', 'timestamp'),
+   )
+
 
 class ChimeraRawData(db.Model):
    __tablename__ = "chimeraRawData"
@@ -96,6 +123,10 @@ class ChimeraRawData(db.Model):
    gas_name = Column(String(50), nullable=True)
    peak_value = Column(Float, nullable=True)
    peak_parts = Column(String(500), nullable=True)  # JSON string of peak parts array
+
+   __table_args__ = (
+       db.Index('ix_chimera_raw_test_device_ts', 'test_id', 'device_id', 'timestamp'),
+   )
    
 
 class BlackBoxEventLogData(db.Model):
@@ -127,6 +158,10 @@ class BlackBoxEventLogData(db.Model):
 
    net_volume_per_gram = Column(Float, nullable=False)
 
+   __table_args__ = (
+       db.Index('ix_blackbox_event_test_device_ts', 'test_id', 'device_id', 'timestamp'),
+   )
+
 
 class Sample(db.Model):
    __tablename__ = "samples"
@@ -144,7 +179,7 @@ class Sample(db.Model):
    substrate_percent_ts = Column(Float)
    substrate_percent_vs = Column(Float)
    author = Column(String)
-   is_inoculum = Column(Boolean, default=False)  # True if this sample can be used as an inoculum (bacteria source)
+   is_inoculum = Column(Boolean, default=False, index=True)  # True if this sample can be used as an inoculum (bacteria source)
    sample_image_data = Column(LargeBinary)
    sample_image_mime_type = Column(String(100))
    sample_image_filename = Column(String(255))
@@ -160,6 +195,33 @@ class Test(db.Model):
    date_ended = Column(DateTime)
    created_by = Column(String)
    status = Column(String, default="setup")  # setup, running, completed
+   data_revision = Column(Integer, nullable=False, default=0, server_default='0')  # Bumped whenever the exported data may have changed; keys the download ETag
+
+   @classmethod
+   def bump_data_revision(cls, test_ids=(), device_ids=(), connection=None):
+       """Bump data_revision of `test_ids` and of every test with exported
+       rows from `device_ids` (their names are part of each row).
+
+       Flushed data rows and device renames are bumped automatically (see
+       _bump_data_revisions below); bulk statements on the data tables must
+       call this. Runs on `connection` as plain Core when given, otherwise
+       through db.session, and the caller commits.
+       """
+       conditions = []
+       if test_ids:
+           conditions.append(cls.id.in_(test_ids))
+       if device_ids:
+           conditions.extend(
+               exists().where(model.test_id == cls.id, model.device_id.in_(device_ids))
+               for model in _EXPORT_MODELS
+           )
+       if not conditions:
+           return
+       stmt = update(cls).where(or_(*conditions)).values(data_revision=cls.data_revision + 1)
+       if connection is not None:
+           connection.execute(stmt)
+       else:
+           db.session.execute(stmt.execution_options(synchronize_session=False))
 
 
 class ChannelConfiguration(db.Model):
@@ -255,3 +317,23 @@ class Outlier(db.Model):
    __table_args__ = (
        db.UniqueConstraint('test_id', 'device_id', 'data_point_id', 'data_type', name='unique_outlier'),
    )
+
+
+# Tables whose rows make up a test's data download
+_EXPORT_MODELS = (BlackBoxEventLogData, BlackboxRawData, ChimeraRawData)
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_data_revisions(session, flush_context):
+    # Runs inside the flush's transaction, so the bump commits or rolls back
+    # with the rows. new/dirty/deleted still describe the pre-flush state.
+    test_ids = set()
+    device_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _EXPORT_MODELS):
+            test_ids.add(obj.test_id)
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Device) and (obj in session.deleted or inspect(obj).attrs.name.history.has_changes()):
+            device_ids.add(obj.id)
+    if test_ids or device_ids:
+        Test.bump_data_revision(test_ids, device_ids, connection=session.connection())
@@ -1,10 +1,26 @@
 import threading
 from typing import Dict, Union, Optional
-from database.models import Device, db
+from sqlalchemy import bindparam, select
+from flask_sse import sse
+from database.models import Device, db, insert_for
 from serial_handler import SerialHandler
 from black_box_handler import BlackBoxHandler
 from chimera_handler import ChimeraHandler
 from plc_handler import PlcHandler
+from utils.errors import logger
+
+# Built once and reused; SQLAlchemy caches their compiled form
+_DEVICES_ON_PORT = select(Device).where(Device.serial_port == bindparam('port'))
+_DEVICE_BY_MAC = select(Device).where(Device.mac_address == bindparam('mac_address'))
+
+# Handler class for each device type reported by the firmware "info" reply
+HANDLER_TYPES = {
+    'black_box': BlackBoxHandler,
+    'black-box': BlackBoxHandler,
+    'chimera': ChimeraHandler,
+    'chimera-max': ChimeraHandler,
+    'plc': PlcHandler,
+}
 
 class DeviceManager:
     _instance = None
@@ -27,6 +43,13 @@ class DeviceManager:
         """Set the Flask app reference for database operations"""
         cls._app = app
 
+    def _publish_status(self, device_id: int, connected: bool):
+        """Push a connection change to /stream listeners (needs app context)."""
+        try:
+            sse.publish({"device_id": device_id, "connected": connected}, type='device_status')
+        except Exception as e:
+            print(f"[DeviceManager] SSE publish failed: {e}")
+
     def _handle_disconnect(self, device_id: int):
         """Handle device disconnection - update database and remove from active handlers"""
         if device_id in self._active_handlers:
@@ -42,10 +65,11 @@ class DeviceManager:
         # Update database with app context
         if self._app:
             with self._app.app_context():
-                device = Device.query.get(device_id)
+                device = db.session.get(Device, device_id)
                 if device:
                     device.connected = False
                     db.session.commit()
+                self._publish_status(device_id, False)
 
     def connect(self, port: str, device_name: Optional[str] = None) -> bool:
         """
@@ -58,13 +82,13 @@ class DeviceManager:
             return False
 
         with self._lock, self._app.app_context():
-            print(f"[DeviceManager] DEBUG: Acquired lock for {port}")
+            logger.debug("[DeviceManager] Acquired lock for %s", port)
 
             # Check if port is already connected
             if self.is_port_connected(port):
                 print(f"[DeviceManager] Port {port} is already connected")
                 # Find the actual active device record for this port
-                for device in Device.query.filter_by(serial_port=port).all():
+                for device in db.session.scalars(_DEVICES_ON_PORT, {'port': port}).all():
                     if device.id in self._active_handlers:
                         if not device.connected:
                             device.connected = True
@@ -72,7 +96,7 @@ class DeviceManager:
                         break
                 return True
 
-            print(f"[DeviceManager] DEBUG: Port {port} not connected, proceeding with connection")
+            logger.debug("[DeviceManager] Port %s not connected, proceeding with connection", port)
             # Auto-detect device type and get MAC address
             temp_handler = SerialHandler()
             device_type = None
@@ -89,43 +113,40 @@ class DeviceManager:
             # Create appropriate handler based on device type
             handler = None
             try:
-                if device_type in ['black_box', 'black-box']:
-                    handler = BlackBoxHandler(port)
-                elif device_type in ['chimera', 'chimera-max']:
-                    handler = ChimeraHandler(port)
-                elif device_type in ["plc"]:
-                    handler = PlcHandler(port)
-                else:
+                handler_class = HANDLER_TYPES.get(device_type)
+                if handler_class is None:
                     return False
+                handler = handler_class(port)
 
                 handler.app = self._app  # Set app context
-                print(f"[DeviceManager] DEBUG: Calling handler.connect() for {port}")
+                logger.debug("[DeviceManager] Calling handler.connect() for %s", port)
                 if not handler.connect():
                     print(f"[DeviceManager] Handler failed to connect to {port}")
                     return False
                 mac_address = handler.mac_address
-                print(f"[DeviceManager] DEBUG: Handler connected, MAC={mac_address}")
+                logger.debug("[DeviceManager] Handler connected, MAC=%s", mac_address)
 
                 # Look up device by MAC address (robust across port changes)
                 device = None
                 if mac_address:
-                    device = Device.query.filter_by(mac_address=mac_address).first()
-                    print(f"[DeviceManager] DEBUG: Found device by MAC: {device.id if device else None}, active_test_id={device.active_test_id if device else None}")
+                    device = db.session.scalars(_DEVICE_BY_MAC, {'mac_address': mac_address}).first()
+                    logger.debug("[DeviceManager] Found device by MAC: %s, active_test_id=%s", device.id if device else None, device.active_test_id if device else None)
 
                 # Check if already connected
                 if device and device.id in self._active_handlers:
-                    print(f"[DeviceManager] DEBUG: Device {device.id} already in _active_handlers, disconnecting duplicate")
+                    logger.debug("[DeviceManager] Device %s already in _active_handlers, disconnecting duplicate", device.id)
                     handler.disconnect()  # Don't need duplicate connection
                     return True
 
                 if device:
+                    device_id = device.id
                     # Existing device - update port if changed
                     if device.serial_port != port:
                         print(f"[DeviceManager] Device {device.id} moved from {device.serial_port} to {port}")
                         device.serial_port = port
                     device.connected = True
                     device.logging = handler.is_logging
-                    print(f"[DeviceManager] DEBUG: Setting handler.test_id = {device.active_test_id}")
+                    logger.debug("[DeviceManager] Setting handler.test_id = %s", device.active_test_id)
                     handler.set_test_id(device.active_test_id)
                     if device_name:
                         device.name = device_name
@@ -138,7 +159,7 @@ class DeviceManager:
                     else:
                         device_name = handler.device_name
 
-                    device = Device(
+                    device_id = self._register_device(
                         name=device_name,
                         device_type=device_type,
                         serial_port=port,
@@ -146,19 +167,27 @@ class DeviceManager:
                         connected=True,
                         logging=handler.is_logging
                     )
-                    db.session.add(device)
+                    if device_id is None:
+                        # MAC registered by another writer since the lookup above
+                        device = db.session.scalars(_DEVICE_BY_MAC, {'mac_address': mac_address}).first()
+                        device.serial_port = port
+                        device.connected = True
+                        device.logging = handler.is_logging
+                        handler.set_test_id(device.active_test_id)
+                        handler.set_name(device.name)
+                        device_id = device.id
                     db.session.commit()
-                    db.session.refresh(device)
 
-                handler.id = device.id
-                print(f"[DeviceManager] DEBUG: Set handler.id = {device.id}")
+                handler.id = device_id
+                logger.debug("[DeviceManager] Set handler.id = %s", device_id)
 
                 # Set the disconnect callback (pass device_id, not port)
-                handler.on_disconnect = lambda: self._handle_disconnect(device.id)
+                handler.on_disconnect = lambda: self._handle_disconnect(device_id)
 
                 # Store handler by device_id (not port)
-                self._active_handlers[device.id] = handler
-                print(f"[DeviceManager] DEBUG: Handler added to _active_handlers. Final state: test_id={handler.test_id}, id={handler.id}, app={handler.app is not None}")
+                self._active_handlers[device_id] = handler
+                logger.debug("[DeviceManager] Handler added to _active_handlers. Final state: test_id=%s, id=%s, app=%s", handler.test_id, handler.id, handler.app is not None)
+                self._publish_status(device_id, True)
 
                 return True
 
@@ -168,14 +197,34 @@ class DeviceManager:
                     handler.disconnect()
                 return False
 
-    def connect_black_box(self, device_id: int, port: str) -> bool:
-        from black_box_handler import BlackBoxHandler
+    @staticmethod
+    def _register_device(**values) -> Optional[int]:
+        """
+        Insert a device row in a single round-trip and return its id.
+        Returns None when the MAC address is already registered, instead of
+        raising IntegrityError.
+        """
+        if not db.engine.dialect.insert_returning:
+            # SQLite < 3.35 has no RETURNING; flush still avoids a refresh SELECT
+            device = Device(**values)
+            db.session.add(device)
+            db.session.flush()
+            return device.id
+
+        stmt = (
+            insert_for(Device)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=['mac_address'])
+            .returning(Device.id)
+        )
+        return db.session.execute(stmt).scalar()
 
+    def connect_black_box(self, device_id: int, port: str) -> bool:
         if not self._app:
             return False
 
         with self._app.app_context():
-            device = Device.query.get(device_id)
+            device = db.session.get(Device, device_id)
             if not device or device.device_type != 'black-box':
                 return False
 
@@ -203,17 +252,16 @@ class DeviceManager:
             if handler.device_name:
                 device.name = handler.device_name
             db.session.commit()
+            self._publish_status(device_id, True)
 
             return True
 
     def connect_chimera(self, device_id: int, port: str) -> bool:
-        from chimera_handler import ChimeraHandler
-
         if not self._app:
             return False
 
         with self._app.app_context():
-            device = Device.query.get(device_id)
+            device = db.session.get(Device, device_id)
             if not device or device.device_type not in ['chimera', 'chimera-max']:
                 return False
 
@@ -240,6 +288,7 @@ class DeviceManager:
             if handler.device_name:
                 device.name = handler.device_name
             db.session.commit()
+            self._publish_status(device_id, True)
 
             return True
 
@@ -249,7 +298,7 @@ class DeviceManager:
             return False
 
         with self._app.app_context():
-            device = Device.query.filter_by(serial_port=port).first()
+            device = db.session.scalars(_DEVICES_ON_PORT, {'port': port}).first()
             if not device:
                 return False
             return self.disconnect_device(device.id)
@@ -259,7 +308,7 @@ class DeviceManager:
             return False
 
         with self._app.app_context():
-            device = Device.query.get(device_id)
+            device = db.session.get(Device, device_id)
 
             if not device:
                 return False
@@ -273,6 +322,7 @@ class DeviceManager:
             # Update database
             device.connected = False
             db.session.commit()
+            self._publish_status(device_id, False)
 
             return True
 
@@ -291,7 +341,7 @@ class DeviceManager:
             if handler:
                 return handler
 
-            device = Device.query.get(device_id)
+            device = db.session.get(Device, device_id)
             if not device or not device.connected:
                 return None
 
@@ -308,6 +358,7 @@ class DeviceManager:
             if not handler.connect():
                 device.connected = False
                 db.session.commit()
+                self._publish_status(device_id, False)
                 return None
 
             handler.mac_address = device.mac_address
@@ -318,13 +369,20 @@ class DeviceManager:
             print(f"[DeviceManager] get_device recreated handler for device {device.id}, test_id={device.active_test_id}")
             return handler
 
+    def has_active_chimera(self) -> bool:
+        """True while a Chimera handler is connected."""
+        return any(
+            handler.device_type in ('chimera', 'chimera-max')
+            for handler in list(self._active_handlers.values())
+        )
+
     def get_device_by_port(self, port: str):
         """Get device handler by port (finds device_id first)"""
         if not self._app:
             return None
 
         with self._app.app_context():
-            devices = Device.query.filter_by(serial_port=port).all()
+            devices = db.session.scalars(_DEVICES_ON_PORT, {'port': port}).all()
             for device in devices:
                 handler = self._active_handlers.get(device.id)
                 if handler:
@@ -397,7 +455,7 @@ class DeviceManager:
         with self._app.app_context():
             ports = []
             for device_id in self._active_handlers:
-                device = Device.query.get(device_id)
+                device = db.session.get(Device, device_id)
                 if device:
                     ports.append(device.serial_port)
             return ports
@@ -407,7 +465,7 @@ class DeviceManager:
         if not self._app:
             return False
         with self._app.app_context():
-            devices = Device.query.filter_by(serial_port=port).all()
+            devices = db.session.scalars(_DEVICES_ON_PORT, {'port': port}).all()
             return any(device.id in self._active_handlers for device in devices)
 
     def get_chimera_reading_channel(self, test_id: int) -> Optional[int]:
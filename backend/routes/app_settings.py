@@ -5,6 +5,7 @@ from utils.auth import require_role
 from werkzeug.utils import secure_filename
 import os
 import re
+from datetime import datetime
 from utils.errors import internal_error
 
 
@@ -104,7 +105,6 @@ def upload_logo():
                 os.remove(old_logo_path)
 
         filename = secure_filename(file.filename)
-        from datetime import datetime
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
         filename = timestamp + filename
 
@@ -189,7 +189,7 @@ def upload_profile_picture(user_id):
     try:
         current_user_id = get_jwt_identity()
         current_user_id = int(current_user_id) if current_user_id is not None else None
-        current_user = User.query.get(current_user_id)
+        current_user = db.session.get(User, current_user_id)
 
         if user_id != current_user_id and not (current_user and current_user.role == 'admin'):
             return jsonify({'error': 'Unauthorized'}), 403
@@ -212,7 +212,7 @@ def upload_profile_picture(user_id):
         if file_size > 2 * 1024 * 1024:
             return jsonify({'error': 'File too large. Max 2 MB'}), 400
 
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
@@ -223,7 +223,6 @@ def upload_profile_picture(user_id):
                 os.remove(old_pic_path)
 
         filename = secure_filename(file.filename)
-        from datetime import datetime
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
         filename = f'profile_{user_id}_{timestamp}{filename}'
 
@@ -242,7 +241,7 @@ def upload_profile_picture(user_id):
 def get_profile_picture(user_id):
     """Serve the profile picture file."""
     try:
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user or not user.profile_picture_filename:
             return jsonify({'error': 'Profile picture not found'}), 404
 
@@ -262,12 +261,12 @@ def delete_profile_picture(user_id):
     try:
         current_user_id = get_jwt_identity()
         current_user_id = int(current_user_id) if current_user_id is not None else None
-        current_user = User.query.get(current_user_id)
+        current_user = db.session.get(User, current_user_id)
 
         if user_id != current_user_id and not (current_user and current_user.role == 'admin'):
             return jsonify({'error': 'Unauthorized'}), 403
 
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
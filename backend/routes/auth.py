@@ -114,7 +114,7 @@ def refresh():
     user_id = int(user_id) if user_id is not None else None
 
     # Verify user still exists and is active
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({"error": "User not found"}), 401
 
@@ -142,7 +142,7 @@ def get_current_user():
     """
     user_id = get_jwt_identity()
     user_id = int(user_id) if user_id is not None else None
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -163,7 +163,7 @@ def verify_password():
     """
     user_id = get_jwt_identity()
     user_id = int(user_id) if user_id is not None else None
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -202,7 +202,7 @@ def change_password():
     """
     user_id = get_jwt_identity()
     user_id = int(user_id) if user_id is not None else None
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_sse import sse
 from flask_jwt_extended import jwt_required
+from sqlalchemy import select
 from datetime import datetime
 import time
 from device_manager import DeviceManager
@@ -12,43 +13,44 @@ black_box_bp = Blueprint('black_box', __name__)
 device_manager = DeviceManager()
 
 
+# Connected devices with the name of the test each is running, in one
+# query rather than a Test lookup per device.
+_CONNECTED_BLACK_BOXES_STMT = (
+    select(
+        Device.id,
+        Device.name,
+        Device.serial_port,
+        Device.mac_address,
+        Device.connected,
+        Device.logging,
+        Device.active_test_id,
+        Test.name.label('active_test_name'),
+    )
+    .select_from(Device)
+    .outerjoin(Test, Test.id == Device.active_test_id)
+    .where(Device.device_type == 'black-box', Device.connected.is_(True))
+)
+
+
 @black_box_bp.route('/api/v1/black_box/connected', methods=['GET'])
 @jwt_required()
 def get_connected_black_boxes():
     """Get all connected BlackBox devices from database"""
     try:
-        connected_black_boxes = Device.query.filter_by(
-            device_type='black-box',
-            connected=True
-        ).all()
-
-        devices_list = []
-        for device in connected_black_boxes:
-            device_data = {
-                "device_id": device.id,
-                "name": device.name,
-                "port": device.serial_port,
-                "mac_address": device.mac_address,
-                "connected": device.connected,
-                "logging": device.logging,
-                "active_test_id": device.active_test_id,
-                "active_test_name": None
-            }
-
-            # Get test name if device is in an active test
-            if device.active_test_id:
-                from database.models import Test
-                test = Test.query.get(device.active_test_id)
-                if test:
-                    device_data["active_test_name"] = test.name
-
-            devices_list.append(device_data)
+        devices_list = [{
+            "device_id": device.id,
+            "name": device.name,
+            "port": device.serial_port,
+            "mac_address": device.mac_address,
+            "connected": device.connected,
+            "logging": device.logging,
+            "active_test_id": device.active_test_id,
+            "active_test_name": device.active_test_name
+        } for device in db.session.execute(_CONNECTED_BLACK_BOXES_STMT)]
         
         return jsonify(devices_list)
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/connect', methods=['POST'])
@@ -57,7 +59,7 @@ def get_connected_black_boxes():
 def connect_black_box(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found in database"}), 404
         
@@ -88,8 +90,6 @@ def connect_black_box(device_id):
         
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/disconnect', methods=['POST'])
@@ -98,7 +98,7 @@ def connect_black_box(device_id):
 def disconnect_black_box(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found in database"}), 404
         
@@ -117,8 +117,6 @@ def disconnect_black_box(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/start_logging', methods=['POST'])
@@ -127,13 +125,13 @@ def disconnect_black_box(device_id):
 def start_logging(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
 
         # Check if device is already part of an active test
         if device.active_test_id:
-            test = Test.query.get(device.active_test_id)
+            test = db.session.get(Test, device.active_test_id)
             if test and test.status == 'running':
                 return jsonify({
                     "error": f"Cannot start logging. Device is already part of active test '{test.name}'. Please stop the test first."
@@ -155,7 +153,7 @@ def start_logging(device_id):
 
         if test_id:
             # Use existing test
-            test = Test.query.get(test_id)
+            test = db.session.get(Test, test_id)
             if not test:
                 return jsonify({"error": "Test not found"}), 404
         else:
@@ -207,8 +205,6 @@ def start_logging(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/stop_logging', methods=['POST'])
@@ -217,13 +213,13 @@ def start_logging(device_id):
 def stop_logging(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
 
         # Check if device is part of an active test
         if device.active_test_id:
-            test = Test.query.get(device.active_test_id)
+            test = db.session.get(Test, device.active_test_id)
             if test and test.status == 'running':
                 return jsonify({
                     "error": f"Cannot stop logging. Device is part of active test '{test.name}'. Please stop the test first."
@@ -258,212 +254,189 @@ def stop_logging(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/info', methods=['GET'])
 @jwt_required()
 def get_info(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        info = handler.get_info()
-        
-        return jsonify(info)
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    info = handler.get_info()
+    
+    return jsonify(info)
+    
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/files', methods=['GET'])
 @jwt_required()
 @require_role(['admin', 'operator', 'technician'])
 def get_files(device_id):
-    try:
-        started_at = time.perf_counter()
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        files_info = handler.get_files()
-        elapsed_ms = (time.perf_counter() - started_at) * 1000.0
-        if elapsed_ms > 1500:
-            file_count = len(files_info.get("files", []))
-            print(f"[BLACKBOX FILES] Slow file list: device_id={device_id} elapsed_ms={elapsed_ms:.1f} files={file_count}")
-        
-        return jsonify(files_info)
-        
-    finally:
-        db.session.close()
+    started_at = time.perf_counter()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    files_info = handler.get_files()
+    elapsed_ms = (time.perf_counter() - started_at) * 1000.0
+    if elapsed_ms > 1500:
+        file_count = len(files_info.get("files", []))
+        print(f"[BLACKBOX FILES] Slow file list: device_id={device_id} elapsed_ms={elapsed_ms:.1f} files={file_count}")
+    
+    return jsonify(files_info)
+    
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/download', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator', 'technician'])
 def download_file(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        data = request.get_json()
-        filename = data.get('filename')
-        max_bytes = data.get('max_bytes')
-        
-        if not filename:
-            return jsonify({"error": "filename is required"}), 400
-        
-        success, lines = handler.download_file(filename, max_bytes)
-        
-        return jsonify({
-            "success": success,
-            "filename": filename,
-            "data": lines if success else None,
-            "error": lines[0] if not success and lines else None
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    data = request.get_json()
+    filename = data.get('filename')
+    max_bytes = data.get('max_bytes')
+    
+    if not filename:
+        return jsonify({"error": "filename is required"}), 400
+    
+    success, lines = handler.download_file(filename, max_bytes)
+    
+    return jsonify({
+        "success": success,
+        "filename": filename,
+        "data": lines if success else None,
+        "error": lines[0] if not success and lines else None
+    })
+    
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/download_from', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator', 'technician'])
 def download_file_from(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        data = request.get_json()
-        filename = data.get('filename')
-        byte_from = data.get('byte_from', 0)
-        
-        if not filename:
-            return jsonify({"error": "filename is required"}), 400
-        
-        success, lines = handler.download_file_from(filename, byte_from)
-        
-        return jsonify({
-            "success": success,
-            "filename": filename,
-            "byte_from": byte_from,
-            "data": lines if success else None,
-            "error": lines[0] if not success and lines else None
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    data = request.get_json()
+    filename = data.get('filename')
+    byte_from = data.get('byte_from', 0)
+    
+    if not filename:
+        return jsonify({"error": "filename is required"}), 400
+    
+    success, lines = handler.download_file_from(filename, byte_from)
+    
+    return jsonify({
+        "success": success,
+        "filename": filename,
+        "byte_from": byte_from,
+        "data": lines if success else None,
+        "error": lines[0] if not success and lines else None
+    })
+    
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/delete_file', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def delete_file(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        data = request.get_json()
-        filename = data.get('filename')
-        
-        if not filename:
-            return jsonify({"error": "filename is required"}), 400
-        
-        success, message = handler.delete_file(filename)
-        
-        return jsonify({
-            "success": success,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    data = request.get_json()
+    filename = data.get('filename')
+    
+    if not filename:
+        return jsonify({"error": "filename is required"}), 400
+    
+    success, message = handler.delete_file(filename)
+    
+    return jsonify({
+        "success": success,
+        "message": message
+    })
+    
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/time', methods=['GET'])
 @jwt_required()
 def get_time(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, dt = handler.get_time()
-        
-        return jsonify({
-            "success": success,
-            "datetime": dt
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, dt = handler.get_time()
+    
+    return jsonify({
+        "success": success,
+        "datetime": dt
+    })
+    
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/time', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def set_time(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, message = handler.set_time()
-        
-        return jsonify({
-            "success": success,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, message = handler.set_time()
+    
+    return jsonify({
+        "success": success,
+        "message": message
+    })
+    
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/name', methods=['POST'])
@@ -472,7 +445,7 @@ def set_time(device_id):
 def set_name(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
         
@@ -502,34 +475,29 @@ def set_name(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/hourly_tips', methods=['GET'])
 @jwt_required()
 def get_hourly_tips(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, lines = handler.get_hourly_tips()
-        
-        return jsonify({
-            "success": success,
-            "data": lines if success else None,
-            "error": lines[0] if not success and lines else None
-        })
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
     
-    finally:
-        db.session.close()
+    success, lines = handler.get_hourly_tips()
+    
+    return jsonify({
+        "success": success,
+        "data": lines if success else None,
+        "error": lines[0] if not success and lines else None
+    })
+
 
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/send_command', methods=['POST'])
@@ -538,7 +506,7 @@ def get_hourly_tips(device_id):
 def send_command(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
         
@@ -561,33 +529,33 @@ def send_command(device_id):
         
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 @black_box_bp.route('/api/v1/black_box/<int:device_id>/stream', methods=['GET'])
 def stream(device_id):
     """SSE endpoint for real-time blackbox notifications for a specific device."""
-    try:
-        # Verify device exists and is connected
-        device = Device.query.get(device_id)
-        if not device:
-            return jsonify({"error": "Device not found"}), 404
-        
-        if device.device_type != 'black-box':
-            return jsonify({"error": "Device is not a black-box"}), 400
-        
-        # Check both database and device manager state
-        if not device.connected:
-            return jsonify({"error": "Device not connected in database"}), 400
-            
-        # Verify device manager has active handler
-        handler = device_manager.get_black_box(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not active"}), 400
-        
-        # Return SSE stream directly
-        print(f"Starting SSE stream for device {device_id}")
-        return sse.stream()
-        
-    finally:
-        db.session.close()
+    # Verify device exists and is connected
+    device = db.session.get(Device, device_id)
+    if not device:
+        return jsonify({"error": "Device not found"}), 404
+    
+    if device.device_type != 'black-box':
+        return jsonify({"error": "Device is not a black-box"}), 400
+    
+    # Check both database and device manager state
+    if not device.connected:
+        return jsonify({"error": "Device not connected in database"}), 400
+        
+    # Verify device manager has active handler
+    handler = device_manager.get_black_box(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not active"}), 400
+    
+    # flask-sse streams under stream_with_context, which keeps the app
+    # context (and Flask-SQLAlchemy's teardown) alive until the client goes
+    # away. Hand the connection back now rather than for the stream's life.
+    db.session.close()
+
+    # Return SSE stream directly
+    print(f"Starting SSE stream for device {device_id}")
+    return sse.stream()
+    
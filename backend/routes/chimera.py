@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_sse import sse
 from flask_jwt_extended import jwt_required
+from sqlalchemy import select
 from datetime import datetime, timezone
 from device_manager import DeviceManager
 from database.models import *
@@ -9,6 +10,7 @@ import os
 import re
 import hashlib
 import threading
+import time
 from utils.errors import internal_error
 
 chimera_bp = Blueprint('chimera', __name__)
@@ -39,7 +41,7 @@ def get_device_config(device_id):
     """Get device configuration including device model (chimera or chimera-max)"""
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found"}), 404
 
@@ -63,8 +65,6 @@ def get_device_config(device_id):
 
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/config/model', methods=['POST'])
@@ -74,7 +74,7 @@ def set_device_model(device_id):
     """Set device model (chimera or chimera-max) - Admin only. Requires API call, not available in UI."""
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found"}), 404
 
@@ -122,8 +122,25 @@ def set_device_model(device_id):
 
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
+
+
+# Connected devices with the name of the test each is running, in one
+# query rather than a Test lookup per device.
+_CONNECTED_CHIMERAS_STMT = (
+    select(
+        Device.id,
+        Device.name,
+        Device.serial_port,
+        Device.mac_address,
+        Device.connected,
+        Device.logging,
+        Device.active_test_id,
+        Test.name.label('active_test_name'),
+    )
+    .select_from(Device)
+    .outerjoin(Test, Test.id == Device.active_test_id)
+    .where(Device.device_type.in_(['chimera', 'chimera-max']), Device.connected.is_(True))
+)
 
 
 @chimera_bp.route('/api/v1/chimera/connected', methods=['GET'])
@@ -131,38 +148,20 @@ def set_device_model(device_id):
 def get_connected_chimeras():
     """Get all connected Chimera devices from database"""
     try:
-        connected_chimeras = Device.query.filter(
-            Device.device_type.in_(['chimera', 'chimera-max']),
-            Device.connected == True
-        ).all()
-
-        devices_list = []
-        for device in connected_chimeras:
-            device_data = {
-                "device_id": device.id,
-                "name": device.name,
-                "port": device.serial_port,
-                "mac_address": device.mac_address,
-                "connected": device.connected,
-                "logging": device.logging,
-                "active_test_id": device.active_test_id,
-                "active_test_name": None
-            }
-
-            # Get test name if device is in an active test
-            if device.active_test_id:
-                from database.models import Test
-                test = Test.query.get(device.active_test_id)
-                if test:
-                    device_data["active_test_name"] = test.name
-
-            devices_list.append(device_data)
+        devices_list = [{
+            "device_id": device.id,
+            "name": device.name,
+            "port": device.serial_port,
+            "mac_address": device.mac_address,
+            "connected": device.connected,
+            "logging": device.logging,
+            "active_test_id": device.active_test_id,
+            "active_test_name": device.active_test_name
+        } for device in db.session.execute(_CONNECTED_CHIMERAS_STMT)]
         
         return jsonify(devices_list)
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/connect', methods=['POST'])
@@ -171,7 +170,7 @@ def get_connected_chimeras():
 def connect_chimera(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found in database"}), 404
         
@@ -203,8 +202,6 @@ def connect_chimera(device_id):
         
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/disconnect', methods=['POST'])
@@ -213,7 +210,7 @@ def connect_chimera(device_id):
 def disconnect_chimera(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found in database"}), 404
         
@@ -233,30 +230,25 @@ def disconnect_chimera(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/info', methods=['GET'])
 @jwt_required()
 def get_info(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        info = handler.get_info()
-        
-        return jsonify(info)
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    info = handler.get_info()
+    
+    return jsonify(info)
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/start_logging', methods=['POST'])
@@ -265,13 +257,13 @@ def get_info(device_id):
 def start_logging(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
 
         # Check if device is already part of an active test
         if device.active_test_id:
-            test = Test.query.get(device.active_test_id)
+            test = db.session.get(Test, device.active_test_id)
             if test and test.status == 'running':
                 return jsonify({
                     "error": f"Cannot start logging. Device is already part of active test '{test.name}'. Please stop the test first."
@@ -295,7 +287,7 @@ def start_logging(device_id):
 
         if test_id:
             # Use existing test
-            test = Test.query.get(test_id)
+            test = db.session.get(Test, test_id)
             if not test:
                 return jsonify({"error": "Test not found"}), 404
         else:
@@ -344,8 +336,6 @@ def start_logging(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/stop_logging', methods=['POST'])
@@ -354,13 +344,13 @@ def start_logging(device_id):
 def stop_logging(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
 
         # Check if device is part of an active test
         if device.active_test_id:
-            test = Test.query.get(device.active_test_id)
+            test = db.session.get(Test, device.active_test_id)
             if test and test.status == 'running':
                 return jsonify({
                     "error": f"Cannot stop logging. Device is part of active test '{test.name}'. Please stop the test first."
@@ -395,445 +385,400 @@ def stop_logging(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/files', methods=['GET'])
 @jwt_required()
 @require_role(['admin', 'operator', 'technician'])
 def get_files(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, result = handler.get_files()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, result = handler.get_files()
 
-        return jsonify({
-            "success": success,
-            "memory": result.get("memory"),
-            "files": result.get("files", [])
-        })
-        
-    finally:
-        db.session.close()
+    return jsonify({
+        "success": success,
+        "memory": result.get("memory"),
+        "files": result.get("files", [])
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/download', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator', 'technician'])
 def download_file(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        data = request.get_json()
-        filename = data.get('filename')
-        
-        if not filename:
-            return jsonify({"error": "filename is required"}), 400
-        
-        success, lines, message = handler.download_file(filename)
-        
-        return jsonify({
-            "success": success,
-            "filename": filename,
-            "data": lines if success else None,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    data = request.get_json()
+    filename = data.get('filename')
+    
+    if not filename:
+        return jsonify({"error": "filename is required"}), 400
+    
+    success, lines, message = handler.download_file(filename)
+    
+    return jsonify({
+        "success": success,
+        "filename": filename,
+        "data": lines if success else None,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/delete_file', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def delete_file(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        data = request.get_json()
-        filename = data.get('filename')
-        
-        if not filename:
-            return jsonify({"error": "filename is required"}), 400
-        
-        success, message = handler.delete_file(filename)
-        
-        return jsonify({
-            "success": success,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    data = request.get_json()
+    filename = data.get('filename')
+    
+    if not filename:
+        return jsonify({"error": "filename is required"}), 400
+    
+    success, message = handler.delete_file(filename)
+    
+    return jsonify({
+        "success": success,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/time', methods=['GET'])
 @jwt_required()
 def get_time(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, dt = handler.get_time()
-        
-        return jsonify({
-            "success": success,
-            "datetime": dt
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, dt = handler.get_time()
+    
+    return jsonify({
+        "success": success,
+        "datetime": dt
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/time', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def set_time(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        # Use UTC time - frontend will convert to local time when displaying
-        dt = datetime.now(timezone.utc)
+    # Use UTC time - frontend will convert to local time when displaying
+    dt = datetime.now(timezone.utc)
 
-        success, message = handler.set_time()
+    success, message = handler.set_time()
 
-        return jsonify({
-            "success": success,
-            "message": message,
-            "timestamp": int(dt.timestamp()),
-            "utc_time": dt.isoformat() + "Z"
-        })
+    return jsonify({
+        "success": success,
+        "message": message,
+        "timestamp": int(dt.timestamp()),
+        "utc_time": dt.isoformat() + "Z"
+    })
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/calibrate', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def calibrate(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        data = request.get_json()
-        sensor_number = data.get('sensor_number')
-        gas_percentage = data.get('gas_percentage')
+    data = request.get_json()
+    sensor_number = data.get('sensor_number')
+    gas_percentage = data.get('gas_percentage')
 
-        if sensor_number is None or gas_percentage is None:
-            return jsonify({"error": "sensor_number and gas_percentage are required"}), 400
+    if sensor_number is None or gas_percentage is None:
+        return jsonify({"error": "sensor_number and gas_percentage are required"}), 400
 
-        # Get device model from config to determine calibration method
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    # Get device model from config to determine calibration method
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
 
-        # Use pump-based calibration for chimera-max, manual for standard chimera
-        if device_model == 'chimera-max':
-            success, message = handler.calibrate_pump(sensor_number, gas_percentage)
-            calibration_type = "pump"
-        else:
-            success, message = handler.calibrate(sensor_number, gas_percentage)
-            calibration_type = "manual"
+    # Use pump-based calibration for chimera-max, manual for standard chimera
+    if device_model == 'chimera-max':
+        success, message = handler.calibrate_pump(sensor_number, gas_percentage)
+        calibration_type = "pump"
+    else:
+        success, message = handler.calibrate(sensor_number, gas_percentage)
+        calibration_type = "manual"
 
-        return jsonify({
-            "success": success,
-            "message": message,
-            "calibration_type": calibration_type
-        })
+    return jsonify({
+        "success": success,
+        "message": message,
+        "calibration_type": calibration_type
+    })
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/timing', methods=['GET'])
 @jwt_required()
 def get_timing(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, timing, message = handler.get_timing()
-        
-        return jsonify({
-            "success": success,
-            "timing": timing,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, timing, message = handler.get_timing()
+    
+    return jsonify({
+        "success": success,
+        "timing": timing,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/timing', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def set_timing(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        data = request.get_json()
-        open_time_ms = data.get('open_time_ms')
-        flush_time_ms = data.get('flush_time_ms')
-        
-        if open_time_ms is None or flush_time_ms is None:
-            return jsonify({"error": "open_time_ms and flush_time_ms are required"}), 400
-        
-        success, message = handler.set_all_timing(open_time_ms, flush_time_ms)
-        
-        return jsonify({
-            "success": success,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    data = request.get_json()
+    open_time_ms = data.get('open_time_ms')
+    flush_time_ms = data.get('flush_time_ms')
+    
+    if open_time_ms is None or flush_time_ms is None:
+        return jsonify({"error": "open_time_ms and flush_time_ms are required"}), 400
+    
+    success, message = handler.set_all_timing(open_time_ms, flush_time_ms)
+    
+    return jsonify({
+        "success": success,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/service', methods=['GET'])
 @jwt_required()
 def get_service(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, service_sequence, message = handler.get_service()
-        
-        return jsonify({
-            "success": success,
-            "service_sequence": service_sequence,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, service_sequence, message = handler.get_service()
+    
+    return jsonify({
+        "success": success,
+        "service_sequence": service_sequence,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/service', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def set_service(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        data = request.get_json()
-        service_sequence = data.get('service_sequence')
-        
-        if not service_sequence:
-            return jsonify({"error": "service_sequence is required"}), 400
-        
-        success, message = handler.set_service(service_sequence)
-        
-        return jsonify({
-            "success": success,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    data = request.get_json()
+    service_sequence = data.get('service_sequence')
+    
+    if not service_sequence:
+        return jsonify({"error": "service_sequence is required"}), 400
+    
+    success, message = handler.set_service(service_sequence)
+    
+    return jsonify({
+        "success": success,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/past_values', methods=['GET'])
 @jwt_required()
 def get_past_values(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, past_data, message = handler.get_past_values()
-        
-        return jsonify({
-            "success": success,
-            "past_data": past_data,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, past_data, message = handler.get_past_values()
+    
+    return jsonify({
+        "success": success,
+        "past_data": past_data,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/sensor_info', methods=['GET'])
 @jwt_required()
 def get_sensor_info(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
-        
-        success, sensor_types, message = handler.get_sensor_info()
-
-        # Current flushing/reading phase, so a freshly opened page can show
-        # the progress ring immediately instead of waiting for the next
-        # valve event (reading phases can run for many minutes).
-        current_phase = None
-        if (handler.is_logging and handler.current_status in ('flushing', 'reading')
-                and handler.current_status_ts):
-            import time
-            current_phase = {
-                "status": handler.current_status,
-                "channel": handler.current_channel,
-                "elapsed_ms": int((time.time() - handler.current_status_ts) * 1000)
-            }
-
-        return jsonify({
-            "success": success,
-            "sensor_types": sensor_types,
-            "message": message,
-            "current_phase": current_phase
-        })
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
+    
+    success, sensor_types, message = handler.get_sensor_info()
+
+    # Current flushing/reading phase, so a freshly opened page can show
+    # the progress ring immediately instead of waiting for the next
+    # valve event (reading phases can run for many minutes).
+    current_phase = None
+    if (handler.is_logging and handler.current_status in ('flushing', 'reading')
+            and handler.current_status_ts):
+        current_phase = {
+            "status": handler.current_status,
+            "channel": handler.current_channel,
+            "elapsed_ms": int((time.time() - handler.current_status_ts) * 1000)
+        }
+
+    return jsonify({
+        "success": success,
+        "sensor_types": sensor_types,
+        "message": message,
+        "current_phase": current_phase
+    })
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/recirculation/enable', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def enable_recirculation(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Recirculation is only available for chimera-max devices (check global config)
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
-        if device_model != 'chimera-max':
-            return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
+    # Recirculation is only available for chimera-max devices (check global config)
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    if device_model != 'chimera-max':
+        return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        success, message = handler.enable_recirculation()
-        
-        return jsonify({
-            "success": success,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    success, message = handler.enable_recirculation()
+    
+    return jsonify({
+        "success": success,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/recirculation/disable', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def disable_recirculation(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Recirculation is only available for chimera-max devices (check global config)
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
-        if device_model != 'chimera-max':
-            return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
+    # Recirculation is only available for chimera-max devices (check global config)
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    if device_model != 'chimera-max':
+        return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        success, message = handler.disable_recirculation()
-        
-        return jsonify({
-            "success": success,
-            "message": message
-        })
-        
-    finally:
-        db.session.close()
+    success, message = handler.disable_recirculation()
+    
+    return jsonify({
+        "success": success,
+        "message": message
+    })
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/recirculation/delay', methods=['POST'])
@@ -841,37 +786,34 @@ def disable_recirculation(device_id):
 @require_role(['admin', 'operator'])
 def set_recirculation_delay(device_id):
     """Set the delay between periodic recirculation runs in seconds."""
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Recirculation is only available for chimera-max devices (check global config)
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
-        if device_model != 'chimera-max':
-            return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
+    # Recirculation is only available for chimera-max devices (check global config)
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    if device_model != 'chimera-max':
+        return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        data = request.get_json()
-        seconds = data.get('seconds')
+    data = request.get_json()
+    seconds = data.get('seconds')
 
-        if seconds is None:
-            return jsonify({"error": "seconds is required"}), 400
+    if seconds is None:
+        return jsonify({"error": "seconds is required"}), 400
 
-        success, message = handler.set_recirculation_delay(seconds)
+    success, message = handler.set_recirculation_delay(seconds)
 
-        return jsonify({
-            "success": success,
-            "message": message
-        })
+    return jsonify({
+        "success": success,
+        "message": message
+    })
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/recirculation/duration', methods=['POST'])
@@ -879,143 +821,131 @@ def set_recirculation_delay(device_id):
 @require_role(['admin', 'operator'])
 def set_recirculation_duration(device_id):
     """Set the duration of each periodic recirculation run in seconds."""
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Recirculation is only available for chimera-max devices (check global config)
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
-        if device_model != 'chimera-max':
-            return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
+    # Recirculation is only available for chimera-max devices (check global config)
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    if device_model != 'chimera-max':
+        return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        data = request.get_json()
-        seconds = data.get('seconds')
+    data = request.get_json()
+    seconds = data.get('seconds')
 
-        if seconds is None:
-            return jsonify({"error": "seconds is required"}), 400
+    if seconds is None:
+        return jsonify({"error": "seconds is required"}), 400
 
-        success, message = handler.set_recirculation_duration(seconds)
+    success, message = handler.set_recirculation_duration(seconds)
 
-        return jsonify({
-            "success": success,
-            "message": message
-        })
+    return jsonify({
+        "success": success,
+        "message": message
+    })
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/recirculation/mode', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def set_recirculation_mode(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Recirculation is only available for chimera-max devices (check global config)
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
-        if device_model != 'chimera-max':
-            return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
+    # Recirculation is only available for chimera-max devices (check global config)
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    if device_model != 'chimera-max':
+        return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        data = request.get_json()
-        mode = data.get('mode')
+    data = request.get_json()
+    mode = data.get('mode')
 
-        if mode is None:
-            return jsonify({"error": "mode is required"}), 400
+    if mode is None:
+        return jsonify({"error": "mode is required"}), 400
 
-        success, message = handler.set_recirculate(mode)
+    success, message = handler.set_recirculate(mode)
 
-        return jsonify({
-            "success": success,
-            "message": message
-        })
+    return jsonify({
+        "success": success,
+        "message": message
+    })
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/recirculation/flag', methods=['POST'])
 @jwt_required()
 @require_role(['admin', 'operator'])
 def recirculation_flag(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Recirculation is only available for chimera-max devices (check global config)
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
-        if device_model != 'chimera-max':
-            return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
+    # Recirculation is only available for chimera-max devices (check global config)
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    if device_model != 'chimera-max':
+        return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        data = request.get_json()
-        channel = data.get('channel')
-        duration = data.get('duration')
-        pump_power = data.get('pump_power')
+    data = request.get_json()
+    channel = data.get('channel')
+    duration = data.get('duration')
+    pump_power = data.get('pump_power')
 
-        if channel is None or duration is None or pump_power is None:
-            return jsonify({"error": "channel, duration, and pump_power are required"}), 400
+    if channel is None or duration is None or pump_power is None:
+        return jsonify({"error": "channel, duration, and pump_power are required"}), 400
 
-        success, message = handler.recirculate_flag(channel, duration, pump_power)
+    success, message = handler.recirculate_flag(channel, duration, pump_power)
 
-        return jsonify({
-            "success": success,
-            "message": message
-        })
+    return jsonify({
+        "success": success,
+        "message": message
+    })
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/recirculation/info', methods=['GET'])
 @jwt_required()
 def get_recirculation_info(device_id):
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
 
-        # Recirculation is only available for chimera-max devices (check global config)
-        device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
-        if device_model != 'chimera-max':
-            return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
+    # Recirculation is only available for chimera-max devices (check global config)
+    device_model = current_app.config.get('CHIMERA_DEVICE_MODEL', 'chimera')
+    if device_model != 'chimera-max':
+        return jsonify({"error": "Recirculation is only available for chimera-max devices"}), 400
 
-        # Get handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not found"}), 404
+    # Get handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not found"}), 404
 
-        success, info = handler.get_recirculation_info()
+    success, info = handler.get_recirculation_info()
 
-        if success:
-            return jsonify(info)
-        else:
-            return jsonify({"error": "Failed to get recirculation info"}), 500
+    if success:
+        return jsonify(info)
+    else:
+        return jsonify({"error": "Failed to get recirculation info"}), 500
 
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/name', methods=['POST'])
@@ -1024,7 +954,7 @@ def get_recirculation_info(device_id):
 def set_name(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
         
@@ -1054,8 +984,6 @@ def set_name(device_id):
     except Exception as e:
         db.session.rollback()
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/send_command', methods=['POST'])
@@ -1064,7 +992,7 @@ def set_name(device_id):
 def send_command(device_id):
     try:
         # Get device from database
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
         
@@ -1087,8 +1015,6 @@ def send_command(device_id):
         
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/stream', methods=['GET'])
@@ -1101,50 +1027,49 @@ def stream(device_id):
     auth_error = check_stream_token()
     if auth_error:
         return auth_error
-    try:
-        # Verify device exists and is connected
-        device = Device.query.get(device_id)
-        if not device:
-            return jsonify({"error": "Device not found"}), 404
-        
-        if device.device_type not in ['chimera', 'chimera-max']:
-            return jsonify({"error": "Device is not a chimera"}), 400
-        
-        # Check both database and device manager state
-        if not device.connected:
-            return jsonify({"error": "Device not connected in database"}), 400
-            
-        # Verify device manager has active handler
-        handler = device_manager.get_chimera(device_id)
-        if not handler:
-            return jsonify({"error": "Device handler not active"}), 400
-        
-        # Return SSE stream directly
-        print(f"Starting SSE stream for chimera device {device_id}")
-        return sse.stream()
+    # Verify device exists and is connected
+    device = db.session.get(Device, device_id)
+    if not device:
+        return jsonify({"error": "Device not found"}), 404
+    
+    if device.device_type not in ['chimera', 'chimera-max']:
+        return jsonify({"error": "Device is not a chimera"}), 400
+    
+    # Check both database and device manager state
+    if not device.connected:
+        return jsonify({"error": "Device not connected in database"}), 400
         
-    finally:
-        db.session.close()
+    # Verify device manager has active handler
+    handler = device_manager.get_chimera(device_id)
+    if not handler:
+        return jsonify({"error": "Device handler not active"}), 400
+    
+    # flask-sse streams under stream_with_context, which keeps the app
+    # context (and Flask-SQLAlchemy's teardown) alive until the client goes
+    # away. Hand the connection back now rather than for the stream's life.
+    db.session.close()
+
+    # Return SSE stream directly
+    print(f"Starting SSE stream for chimera device {device_id}")
+    return sse.stream()
+    
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/data_stream', methods=['GET'])
 @jwt_required()
 def get_data_stream_info(device_id):
     """Get information about how to receive real-time data"""
-    try:
-        # Get device from database
-        device = Device.query.get(device_id)
-        if not device or not device.connected:
-            return jsonify({"error": "Device not found or not connected"}), 404
-        
-        return jsonify({
-            "message": "Use /api/v1/chimera/{device_id}/stream for real-time SSE datapoint streaming",
-            "format": "datapoint [channel_number] [sensor_data...]",
-            "stream_endpoint": f"/api/v1/chimera/{device_id}/stream"
-        })
-        
-    finally:
-        db.session.close()
+    # Get device from database
+    device = db.session.get(Device, device_id)
+    if not device or not device.connected:
+        return jsonify({"error": "Device not found or not connected"}), 404
+    
+    return jsonify({
+        "message": "Use /api/v1/chimera/{device_id}/stream for real-time SSE datapoint streaming",
+        "format": "datapoint [channel_number] [sensor_data...]",
+        "stream_endpoint": f"/api/v1/chimera/{device_id}/stream"
+    })
+    
 
 
 BUNDLED_FIRMWARE_PATH = os.path.abspath(os.path.join(
@@ -1180,7 +1105,7 @@ def _firmware_update_preflight(device_id):
 
     Returns (handler, error_response); exactly one is None.
     """
-    device = Device.query.get(device_id)
+    device = db.session.get(Device, device_id)
     if not device or not device.connected:
         return None, (jsonify({"error": "Device not found or not connected"}), 404)
 
@@ -1192,7 +1117,7 @@ def _firmware_update_preflight(device_id):
         return None, (jsonify({"error": "Device handler not found"}), 404)
 
     if device.active_test_id:
-        test = Test.query.get(device.active_test_id)
+        test = db.session.get(Test, device.active_test_id)
         if test and test.status == 'running':
             return None, (jsonify({
                 "error": "Cannot update firmware while a test is running on this device"
@@ -1217,37 +1142,34 @@ def firmware_update(device_id):
     'firmware_update_progress' events and the outcome as
     'firmware_update_complete'.
     """
-    try:
-        handler, error = _firmware_update_preflight(device_id)
-        if error:
-            return error
+    handler, error = _firmware_update_preflight(device_id)
+    if error:
+        return error
 
-        if 'firmware' not in request.files:
-            return jsonify({"error": "No firmware file uploaded (expected field 'firmware')"}), 400
+    if 'firmware' not in request.files:
+        return jsonify({"error": "No firmware file uploaded (expected field 'firmware')"}), 400
 
-        file = request.files['firmware']
-        if not file.filename or not file.filename.lower().endswith('.bin'):
-            return jsonify({"error": "Firmware must be a .bin file"}), 400
+    file = request.files['firmware']
+    if not file.filename or not file.filename.lower().endswith('.bin'):
+        return jsonify({"error": "Firmware must be a .bin file"}), 400
 
-        firmware_data = file.read()
-        if len(firmware_data) < 100 * 1024 or len(firmware_data) > 8 * 1024 * 1024:
-            return jsonify({"error": "Firmware file size looks wrong (expected 100KB-8MB)"}), 400
+    firmware_data = file.read()
+    if len(firmware_data) < 100 * 1024 or len(firmware_data) > 8 * 1024 * 1024:
+        return jsonify({"error": "Firmware file size looks wrong (expected 100KB-8MB)"}), 400
 
-        # Every ESP32 app image starts with the 0xE9 magic byte; catches
-        # uploads of the wrong file before anything is sent to the device.
-        if firmware_data[0] != 0xE9:
-            return jsonify({"error": "Not a valid ESP32 firmware image"}), 400
+    # Every ESP32 app image starts with the 0xE9 magic byte; catches
+    # uploads of the wrong file before anything is sent to the device.
+    if firmware_data[0] != 0xE9:
+        return jsonify({"error": "Not a valid ESP32 firmware image"}), 400
 
-        _launch_firmware_update(handler, device_id, firmware_data)
+    _launch_firmware_update(handler, device_id, firmware_data)
 
-        return jsonify({
-            "success": True,
-            "message": "Firmware update started",
-            "size": len(firmware_data)
-        }), 202
+    return jsonify({
+        "success": True,
+        "message": "Firmware update started",
+        "size": len(firmware_data)
+    }), 202
 
-    finally:
-        db.session.close()
 
 
 def _launch_firmware_update(handler, device_id, firmware_data):
@@ -1304,7 +1226,7 @@ def firmware_check(device_id):
     """Compare the repo-bundled firmware.bin against the device's running
     firmware (via the firmwarehash serial command)."""
     try:
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device or not device.connected:
             return jsonify({"error": "Device not found or not connected"}), 404
 
@@ -1344,8 +1266,6 @@ def firmware_check(device_id):
 
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @chimera_bp.route('/api/v1/chimera/<int:device_id>/firmware_update_bundled', methods=['POST'])
@@ -1353,23 +1273,20 @@ def firmware_check(device_id):
 @require_role(['admin'])
 def firmware_update_bundled(device_id):
     """Flash the firmware.bin bundled with this software release."""
-    try:
-        handler, error = _firmware_update_preflight(device_id)
-        if error:
-            return error
+    handler, error = _firmware_update_preflight(device_id)
+    if error:
+        return error
 
-        data, bundled_hash, reason = _load_bundled_firmware()
-        if data is None:
-            return jsonify({"error": "No valid bundled firmware available", "reason": reason}), 404
+    data, bundled_hash, reason = _load_bundled_firmware()
+    if data is None:
+        return jsonify({"error": "No valid bundled firmware available", "reason": reason}), 404
 
-        _launch_firmware_update(handler, device_id, data)
+    _launch_firmware_update(handler, device_id, data)
 
-        return jsonify({
-            "success": True,
-            "message": "Firmware update started",
-            "size": len(data),
-            "bundled_hash": bundled_hash
-        }), 202
+    return jsonify({
+        "success": True,
+        "message": "Firmware update started",
+        "size": len(data),
+        "bundled_hash": bundled_hash
+    }), 202
 
-    finally:
-        db.session.close()
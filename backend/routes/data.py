@@ -1,9 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from database.models import *
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_
 from utils.auth import require_minimum_role, log_audit, get_current_user
-from utils.errors import internal_error
+from utils.errors import internal_error, logger
 
 data_bp = Blueprint('data', __name__)
 
@@ -18,13 +18,13 @@ def get_device_data(test_id, device_id):
         start_time = request.args.get('start_time')
         end_time = request.args.get('end_time')
         
-        print(f"DEBUG: Fetching data for Test {test_id}, Device {device_id}")
-        print(f"DEBUG: Params - Type: {data_type}, Aggregation: {aggregation}, Start: {start_time}, End: {end_time}")
+        logger.debug("Fetching data for test %s, device %s", test_id, device_id)
+        logger.debug("Params - type: %s, aggregation: %s, start: %s, end: %s", data_type, aggregation, start_time, end_time)
         
         # Verify device exists
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
-            print("DEBUG: Device not found")
+            logger.debug("Device not found")
             return jsonify({"error": "Device not found"}), 404
             
         # Determine which table to query based on device type and data type
@@ -44,7 +44,7 @@ def get_device_data(test_id, device_id):
                 if channels_configured:
                     model = BlackBoxEventLogData
                 else:
-                    print("DEBUG: No channel configuration found")
+                    logger.debug("No channel configuration found")
                     return jsonify({
                         "error": "Plots can't be rendered in manual logging mode for the blackbox due to unconfigured channels",
                         "code": "NO_CHANNEL_CONFIG"
@@ -53,11 +53,11 @@ def get_device_data(test_id, device_id):
             # Chimera only has raw data for now
             model = ChimeraRawData
         else:
-            print(f"DEBUG: Unsupported device type: {device.device_type}")
+            logger.debug("Unsupported device type: %s", device.device_type)
             return jsonify({"error": f"Unsupported device type: {device.device_type}"}), 400
             
         if not model:
-            print("DEBUG: Could not determine data model")
+            logger.debug("Could not determine data model")
             return jsonify({"error": "Could not determine data model"}), 500
             
         limit = request.args.get('limit', type=int)
@@ -188,9 +188,9 @@ def get_device_data(test_id, device_id):
                 
             data.append(item)
         
-        print(f"DEBUG: Found {len(data)} records")
-        if len(data) > 0:
-            print(f"DEBUG: First record sample: {data[0]}")
+        logger.debug("Found %d records", len(data))
+        if data:
+            logger.debug("First record sample: %s", data[0])
             
         return jsonify({
             "test_id": test_id,
@@ -203,10 +203,7 @@ def get_device_data(test_id, device_id):
         })
         
     except Exception as e:
-        print(f"DEBUG: Error occurred: {str(e)}")
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @data_bp.route('/api/v1/tests/<int:test_id>/devices', methods=['GET'])
@@ -252,7 +249,7 @@ def get_test_devices(test_id):
         # 4. Fetch Device details and format response
         response_data = []
         for device_id, info in devices_map.items():
-            device = Device.query.get(device_id)
+            device = db.session.get(Device, device_id)
             if device:
                 response_data.append({
                     "id": device.id,
@@ -265,8 +262,6 @@ def get_test_devices(test_id):
 
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 @data_bp.route('/api/v1/events/recent', methods=['GET'])
 @jwt_required()
@@ -311,7 +306,6 @@ def get_recent_events():
 
         # 2. Fetch Chimera Raw Data (Gas Analysis) - group by timestamp/channel
         # Fetch recent gas data (multiple sensors per timestamp/channel)
-        from sqlalchemy import func
         
         # Get the most recent 30 distinct timestamp/channel/device combinations
         # (to ensure we have enough after grouping)
@@ -408,8 +402,6 @@ def get_recent_events():
 
     except Exception as e:
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @data_bp.route('/api/v1/tests/<int:test_id>/device/<int:device_id>/data', methods=['DELETE'])
@@ -426,7 +418,7 @@ def delete_data_points(test_id, device_id):
             return jsonify({"error": "ids must be a non-empty array"}), 400
 
         # Verify device exists
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found"}), 404
 
@@ -474,8 +466,6 @@ def delete_data_points(test_id, device_id):
     except Exception as e:
         print(f"ERROR in delete_data_points: {str(e)}")
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 # ==================== OUTLIER ENDPOINTS ====================
@@ -528,7 +518,7 @@ def label_outliers(test_id, device_id):
             return jsonify({"error": "User not found"}), 401
 
         # Verify device exists
-        device = Device.query.get(device_id)
+        device = db.session.get(Device, device_id)
         if not device:
             return jsonify({"error": "Device not found"}), 404
 
@@ -573,8 +563,6 @@ def label_outliers(test_id, device_id):
         db.session.rollback()
         print(f"ERROR in label_outliers: {str(e)}")
         return internal_error(e)
-    finally:
-        db.session.close()
 
 
 @data_bp.route('/api/v1/tests/<int:test_id>/device/<int:device_id>/outliers', methods=['DELETE'])
@@ -625,5 +613,3 @@ def remove_outlier_labels(test_id, device_id):
         db.session.rollback()
         print(f"ERROR in remove_outlier_labels: {str(e)}")
         return internal_error(e)
-    finally:
-        db.session.close()
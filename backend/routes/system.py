@@ -4,6 +4,16 @@ from sqlalchemy.engine import make_url
 from database.models import *
 from utils.auth import require_role
 import os
+import csv
+import glob
+import io
+import re
+import subprocess
+import tempfile
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from utils.serial_logger import serial_logger
 from utils.errors import internal_error
 
 
@@ -14,9 +24,6 @@ system_bp = Blueprint('system', __name__)
 @require_role(['admin'])
 def download_serial_log():
     """Download the serial communication log file"""
-    from flask import send_file
-    from utils.serial_logger import serial_logger
-    import io
 
     try:
         if not serial_logger.log_exists():
@@ -37,7 +44,6 @@ def download_serial_log():
 @require_role(['admin'])
 def clear_serial_log():
     """Clear the serial communication log file"""
-    from utils.serial_logger import serial_logger
 
     try:
         success = serial_logger.clear_log()
@@ -54,7 +60,6 @@ def clear_serial_log():
 @require_role(['admin'])
 def serial_log_info():
     """Get information about the serial log file"""
-    from utils.serial_logger import serial_logger
 
     try:
         size_bytes = serial_logger.get_log_size()
@@ -125,8 +130,6 @@ def download_database():
 @require_role(['admin'])
 def transfer_database():
     """Replace the SQLite database file with an uploaded one (admin only)."""
-    from datetime import datetime
-    import tempfile
 
     try:
         confirm = request.form.get('confirm')
@@ -167,7 +170,6 @@ def transfer_database():
         # Keep only the newest backups — the SD card is small and each
         # transfer would otherwise leave another full copy forever.
         keep = 3
-        import glob
         backups = sorted(glob.glob(f"{db_path}.bak-*"), reverse=True)
         for stale_backup in backups[keep:]:
             try:
@@ -248,13 +250,72 @@ def delete_database():
         return internal_error(e)
 
 
+_update_start_lock = threading.Lock()
+
+
+def _start_update_service():
+    """Queue the systemd updater unit unless it is already running."""
+    service_name = os.environ.get('FLASKAPP_UPDATE_SERVICE', 'flaskapp-updater.service')
+    runtime_env = os.environ.copy()
+    runtime_env.setdefault('PATH', '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin')
+
+    # Check if an update is already running (active or activating).
+    is_active = subprocess.run(
+        ['/bin/systemctl', 'show', '--property=ActiveState', '--value', service_name],
+        env=runtime_env,
+        capture_output=True,
+        text=True
+    )
+    state = (is_active.stdout or '').strip()
+    if state in ('active', 'activating'):
+        return jsonify({
+            "success": False,
+            "error": "Another update is already running."
+        }), 409
+
+    # Try direct systemctl first; if backend user lacks privileges, try passwordless sudo.
+    start_attempts = [
+        ['/bin/systemctl', 'start', '--no-block', service_name],
+        ['/usr/bin/sudo', '-n', '/bin/systemctl', 'start', '--no-block', service_name]
+    ]
+
+    last_error = ""
+    for cmd in start_attempts:
+        try:
+            result = subprocess.run(
+                cmd,
+                env=runtime_env,
+                capture_output=True,
+                text=True,
+                timeout=20
+            )
+        except subprocess.TimeoutExpired:
+            continue
+
+        if result.returncode == 0:
+            return jsonify({
+                "success": True,
+                "message": "Update started. Services will restart during update. Wait ~1-2 minutes, then refresh."
+            }), 202
+
+        err_text = (result.stderr or result.stdout or "").strip()
+        if err_text:
+            last_error = err_text
+
+    return jsonify({
+        "success": False,
+        "error": (
+            "Failed to start updater service. Ensure systemd unit '"
+            f"{service_name}' exists and backend can start it. {last_error}"
+        ).strip()
+    }), 500
+
+
 @system_bp.route("/api/v1/system/git-pull", methods=['POST'])
 @jwt_required()
 @require_role(['admin'])
 def git_pull():
     """Start software update via systemd updater service."""
-    import subprocess
-    import os
 
     try:
         running_tests = Test.query.filter_by(status='running').count()
@@ -264,60 +325,17 @@ def git_pull():
                 "error": "Cannot update while tests are running. Stop all running tests first."
             }), 409
 
-        service_name = os.environ.get('FLASKAPP_UPDATE_SERVICE', 'flaskapp-updater.service')
-        runtime_env = os.environ.copy()
-        runtime_env.setdefault('PATH', '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin')
-
-        # Check if an update is already running (active or activating).
-        is_active = subprocess.run(
-            ['/bin/systemctl', 'show', '--property=ActiveState', '--value', service_name],
-            env=runtime_env,
-            capture_output=True,
-            text=True
-        )
-        state = (is_active.stdout or '').strip()
-        if state in ('active', 'activating'):
+        # Single-flight: two clicks could otherwise both pass the
+        # ActiveState check before either start job is queued.
+        if not _update_start_lock.acquire(blocking=False):
             return jsonify({
                 "success": False,
                 "error": "Another update is already running."
             }), 409
-
-        # Try direct systemctl first; if backend user lacks privileges, try passwordless sudo.
-        start_attempts = [
-            ['/bin/systemctl', 'start', '--no-block', service_name],
-            ['/usr/bin/sudo', '-n', '/bin/systemctl', 'start', '--no-block', service_name]
-        ]
-
-        last_error = ""
-        for cmd in start_attempts:
-            try:
-                result = subprocess.run(
-                    cmd,
-                    env=runtime_env,
-                    capture_output=True,
-                    text=True,
-                    timeout=20
-                )
-            except subprocess.TimeoutExpired:
-                continue
-
-            if result.returncode == 0:
-                return jsonify({
-                    "success": True,
-                    "message": "Update started. Services will restart during update. Wait ~1-2 minutes, then refresh."
-                }), 202
-
-            err_text = (result.stderr or result.stdout or "").strip()
-            if err_text:
-                last_error = err_text
-
-        return jsonify({
-            "success": False,
-            "error": (
-                "Failed to start updater service. Ensure systemd unit '"
-                f"{service_name}' exists and backend can start it. {last_error}"
-            ).strip()
-        }), 500
+        try:
+            return _start_update_service()
+        finally:
+            _update_start_lock.release()
     except Exception as e:
         return jsonify({
             "success": False,
@@ -330,7 +348,6 @@ def git_pull():
 @require_role(['admin'])
 def update_check():
     """Compare the local commit against the remote update branch."""
-    import subprocess
 
     repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     branch = os.environ.get('UPDATE_BRANCH', 'master')
@@ -383,8 +400,6 @@ def update_status():
     key changes), and the polling client must still be able to read the
     outcome. Only exposes the parsed tail of update.log.
     """
-    import re
-    from datetime import datetime
 
     log_path = os.path.join(
         os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
@@ -584,11 +599,6 @@ def download_audit_logs():
     Returns: CSV file
     """
     try:
-        import io
-        import csv
-        from datetime import timezone
-        from zoneinfo import ZoneInfo
-        from flask import send_file
 
         # Get filters from query parameters
         action_filter = request.args.get('action', None)
@@ -616,7 +626,7 @@ def download_audit_logs():
 
         # Get current user's CSV delimiter preference
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = db.session.get(User, current_user_id)
         csv_delimiter = user.csv_delimiter if user else ','
 
         # Timestamps are stored as naive UTC datetimes. When the user prefers
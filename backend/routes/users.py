@@ -15,7 +15,7 @@ def get_current_user():
     """
     user_id = get_jwt_identity()
     user_id = int(user_id) if user_id is not None else None
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -44,7 +44,7 @@ def get_user(user_id):
     """
     Get a specific user by ID (admin only).
     """
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -141,7 +141,7 @@ def update_user(user_id):
     """
     current_user_id = get_jwt_identity()
     current_user_id = int(current_user_id) if current_user_id is not None else None
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -208,7 +208,7 @@ def reset_user_password(user_id):
     """
     current_user_id = get_jwt_identity()
     current_user_id = int(current_user_id) if current_user_id is not None else None
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -242,7 +242,7 @@ def delete_user(user_id):
     if user_id == current_user_id:
         return jsonify({"error": "Cannot delete your own account"}), 400
 
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -287,7 +287,7 @@ def update_user_preferences():
     """
     user_id = get_jwt_identity()
     user_id = int(user_id) if user_id is not None else None
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -57,6 +57,7 @@ class SerialHandler:
                 timeout=self.timeout,
                 write_timeout=self.timeout
             )
+            self._set_low_latency()
             self.clear_buffer()
             self._start_reader_thread()
             # Small delay to let the connection stabilize
@@ -64,6 +65,18 @@ class SerialHandler:
             return True
         except serial.SerialException as e:
             raise Exception(f"Failed to connect to {self.port}: {str(e)}")
+
+    def _set_low_latency(self):
+        """Ask the driver to flush received bytes immediately (ASYNC_LOW_LATENCY).
+
+        Many USB-serial adapters otherwise hold data for a latency timer (often
+        16ms), which adds up over the info/mac handshake. Only Linux supports
+        this and not every driver does, so failures are ignored.
+        """
+        try:
+            self.connection.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, ValueError, OSError):
+            pass
         
 
     def get_type(self, port: str, timeout: float = 2.0) -> str:
@@ -0,0 +1,89 @@
+"""Shared fixtures for the app-level tests.
+
+The hardware scripts in this directory talk to real serial ports; the tests
+built on these fixtures run against the Flask app with a throwaway SQLite
+database and no devices attached.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Config is read when app.py is first imported, so point it at a scratch
+# database (and keep it from scanning serial ports) before anything loads it.
+_DB_DIR = tempfile.mkdtemp(prefix='flaskapp-tests-')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(_DB_DIR, 'test.db')
+os.environ['JWT_SECRET_KEY'] = 'test-jwt-secret-' + 'x' * 32
+os.environ['DISABLE_AUTO_CONNECT'] = '1'
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app as flask_app
+    flask_app.config['TESTING'] = True
+    return flask_app
+
+
+@pytest.fixture
+def db(app):
+    """Fresh tables for every test, inside an app context."""
+    from database.models import db as _db
+    from utils.cache import response_cache
+
+    with app.app_context():
+        _db.drop_all()
+        _db.create_all()
+        response_cache.clear()
+        yield _db
+        _db.session.remove()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(db):
+    from database.models import User
+
+    def _make_user(role='admin', **values):
+        user = User(
+            username=values.pop('username', f'{role}-user'),
+            email=values.pop('email', f'{role}@example.com'),
+            password_hash='not-a-real-hash',
+            role=role,
+            **values
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return _make_user
+
+
+@pytest.fixture
+def auth_headers(app, make_user):
+    """Authorization headers for a new user with `role`."""
+    from flask_jwt_extended import create_access_token
+
+    def _auth_headers(role='admin', **values):
+        user = make_user(role, **values)
+        token = create_access_token(identity=str(user.id))
+        return {'Authorization': f'Bearer {token}'}
+    return _auth_headers
+
+
+@pytest.fixture
+def device_manager(app):
+    """The app's DeviceManager, with any handlers a test registers dropped afterwards."""
+    manager = app.extensions['device_manager']
+    handlers = dict(manager._active_handlers)
+    yield manager
+    manager._active_handlers.clear()
+    manager._active_handlers.update(handlers)
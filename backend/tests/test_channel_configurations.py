@@ -0,0 +1,109 @@
+import pytest
+
+from database import models
+from database.models import ChannelConfiguration, Device
+
+
+@pytest.fixture
+def setup(db, auth_headers):
+    test = models.Test(name='Run')
+    device = Device(name='Box', device_type='black-box', serial_port='/dev/ttyUSB0')
+    db.session.add_all([test, device])
+    db.session.commit()
+    return test.id, device.id, auth_headers('operator')
+
+
+def _post(client, headers, test_id, configurations):
+    return client.post(
+        f'/api/v1/tests/{test_id}/configurations',
+        json={'configurations': configurations},
+        headers=headers,
+    )
+
+
+def _channel(device_id, channel_number, **values):
+    return dict({'device_id': device_id, 'channel_number': channel_number, 'tumbler_volume': 10}, **values)
+
+
+def _stored(db, test_id):
+    db.session.expire_all()
+    return {
+        config.channel_number: config
+        for config in ChannelConfiguration.query.filter_by(test_id=test_id)
+    }
+
+
+def test_inserts_new_channels(client, db, setup):
+    test_id, device_id, headers = setup
+
+    response = _post(client, headers, test_id, [
+        _channel(device_id, 1, inoculum_weight_grams='2.5', notes='first'),
+        _channel(device_id, 2, substrate_sample_id=''),
+    ])
+
+    assert response.status_code == 201
+    stored = _stored(db, test_id)
+    assert sorted(stored) == [1, 2]
+    assert stored[1].inoculum_weight_grams == 2.5
+    assert stored[1].notes == 'first'
+    assert stored[2].substrate_sample_id is None
+    assert all(config.in_service for config in stored.values())
+    assert all(config.tip_count == 0 for config in stored.values())
+
+
+def test_resubmission_updates_rows_in_place(client, db, setup):
+    test_id, device_id, headers = setup
+    _post(client, headers, test_id, [_channel(device_id, 1)])
+    original_id = _stored(db, test_id)[1].id
+
+    response = _post(client, headers, test_id, [_channel(device_id, 1, tumbler_volume=12.5, chimera_channel='3')])
+
+    assert response.status_code == 201
+    stored = _stored(db, test_id)
+    assert list(stored) == [1]
+    assert stored[1].id == original_id
+    assert stored[1].tumbler_volume == 12.5
+    assert stored[1].chimera_channel == 3
+
+
+def test_omitted_in_service_keeps_stored_value(client, db, setup):
+    test_id, device_id, headers = setup
+    _post(client, headers, test_id, [_channel(device_id, 1, in_service=False), _channel(device_id, 2)])
+
+    response = _post(client, headers, test_id, [_channel(device_id, 1), _channel(device_id, 2, in_service='off')])
+
+    assert response.status_code == 201
+    stored = _stored(db, test_id)
+    assert stored[1].in_service is False
+    assert stored[2].in_service is False
+
+
+def test_supplied_in_service_overwrites_stored_value(client, db, setup):
+    test_id, device_id, headers = setup
+    _post(client, headers, test_id, [_channel(device_id, 1, in_service=False)])
+
+    _post(client, headers, test_id, [_channel(device_id, 1, in_service='yes')])
+
+    assert _stored(db, test_id)[1].in_service is True
+
+
+def test_repeated_channel_keeps_last_entry(client, db, setup):
+    test_id, device_id, headers = setup
+
+    response = _post(client, headers, test_id, [
+        _channel(device_id, 1, notes='first'),
+        _channel(device_id, 1, notes='second'),
+    ])
+
+    assert response.status_code == 201
+    assert 'Created/updated 1 channel' in response.get_json()['message']
+    assert _stored(db, test_id)[1].notes == 'second'
+
+
+def test_invalid_device_writes_nothing(client, db, setup):
+    test_id, device_id, headers = setup
+
+    response = _post(client, headers, test_id, [_channel(device_id, 1), _channel('not-a-device', 2)])
+
+    assert response.status_code == 400
+    assert _stored(db, test_id) == {}
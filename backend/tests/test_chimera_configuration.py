@@ -0,0 +1,100 @@
+import pytest
+
+from database import models
+from database.models import ChimeraChannelConfiguration, ChimeraConfiguration, Device
+
+
+@pytest.fixture
+def setup(db, auth_headers):
+    test = models.Test(name='Run')
+    device = Device(name='Chimera', device_type='chimera', serial_port='/dev/ttyUSB0')
+    db.session.add_all([test, device])
+    db.session.commit()
+    return test.id, device.id, auth_headers('operator')
+
+
+def _post(client, headers, test_id, device_id, service_sequence, channel_settings=None, **values):
+    return client.post(
+        f'/api/v1/tests/{test_id}/chimera-configuration',
+        json=dict(
+            {'device_id': device_id, 'service_sequence': service_sequence, 'channel_settings': channel_settings or {}},
+            **values
+        ),
+        headers=headers,
+    )
+
+
+def _channels(db, chimera_config_id):
+    db.session.expire_all()
+    return {
+        channel.channel_number: channel
+        for channel in ChimeraChannelConfiguration.query.filter_by(chimera_config_id=chimera_config_id)
+    }
+
+
+def test_creates_a_row_per_in_service_channel(client, db, setup):
+    test_id, device_id, headers = setup
+
+    response = _post(client, headers, test_id, device_id, '101000000000000', {
+        '1': {'openTime': '45', 'volumeThreshold': '250'},
+        '2': {'openTime': '99'},
+    }, flush_time_seconds=20)
+
+    assert response.status_code == 201
+    config_id = response.get_json()['chimera_config_id']
+    assert db.session.get(ChimeraConfiguration, config_id).flush_time_seconds == 20
+    channels = _channels(db, config_id)
+    assert sorted(channels) == [1, 3]
+    assert (channels[1].open_time_seconds, channels[1].volume_threshold_ml) == (45.0, 250.0)
+    assert (channels[3].open_time_seconds, channels[3].volume_threshold_ml) == (600.0, None)
+
+
+def test_resubmission_updates_channels_and_deletes_stale_ones(client, db, setup):
+    test_id, device_id, headers = setup
+    config_id = _post(client, headers, test_id, device_id, '111000000000000').get_json()['chimera_config_id']
+    original = _channels(db, config_id)
+    original[2].volume_since_last_recirculation = 12.5
+    db.session.commit()
+
+    response = _post(client, headers, test_id, device_id, '011100000000000', {'2': {'openTime': '30', 'volumeThreshold': '80'}})
+
+    assert response.status_code == 201
+    assert response.get_json()['chimera_config_id'] == config_id
+    assert db.session.query(ChimeraConfiguration).count() == 1
+    channels = _channels(db, config_id)
+    assert sorted(channels) == [2, 3, 4]
+    assert channels[2].id == original[2].id
+    assert (channels[2].open_time_seconds, channels[2].volume_threshold_ml) == (30.0, 80.0)
+    # The recirculation tracker is not part of the submitted settings
+    assert channels[2].volume_since_last_recirculation == 12.5
+
+
+def test_no_channels_in_service_deletes_them_all(client, db, setup):
+    test_id, device_id, headers = setup
+    config_id = _post(client, headers, test_id, device_id, '111111111111111').get_json()['chimera_config_id']
+
+    response = _post(client, headers, test_id, device_id, '000000000000000')
+
+    assert response.status_code == 201
+    assert _channels(db, config_id) == {}
+
+
+def test_other_configurations_are_left_alone(client, db, setup):
+    test_id, device_id, headers = setup
+    other = Device(name='Other', device_type='chimera', serial_port='/dev/ttyUSB1')
+    db.session.add(other)
+    db.session.commit()
+    other_config_id = _post(client, headers, test_id, other.id, '110000000000000').get_json()['chimera_config_id']
+
+    _post(client, headers, test_id, device_id, '001000000000000')
+
+    assert sorted(_channels(db, other_config_id)) == [1, 2]
+
+
+def test_periodic_mode_requires_delay(client, db, setup):
+    test_id, device_id, headers = setup
+
+    response = _post(client, headers, test_id, device_id, '100000000000000', recirculation_mode='periodic')
+
+    assert response.status_code == 400
+    assert db.session.query(ChimeraConfiguration).count() == 0
@@ -0,0 +1,202 @@
+import io
+from collections import OrderedDict
+
+import pytest
+
+import routes.devices_tests as devices_tests
+from routes.devices_tests import _parse_configuration_csv, _parse_configuration_csv_cached
+
+HEADER = [
+    'Channel number', 'Sample description', 'In service', 'Inoculum only',
+    'Inoculum mass VS (g)', 'Sample mass VS (g)', 'Tumbler volume (ml)', 'Chimera channel',
+]
+
+
+def _csv_text(rows, delimiter=',', header=HEADER):
+    return '\n'.join(delimiter.join(row) for row in [header, *rows]) + '\n'
+
+
+def _parse(rows, delimiter=',', header=HEADER):
+    return _parse_configuration_csv(io.StringIO(_csv_text(rows, delimiter, header), newline=''), delimiter)
+
+
+def test_parses_channel_rows():
+    configurations = _parse([
+        ['1', 'Cellulose', '1', '0', '10', '2.5', '9', '3'],
+        ['2', 'Control', 'yes', 'true', '10', '2.5', '9', ''],
+    ])
+
+    assert configurations == [
+        {
+            'channel_number': 1, 'inoculum_weight_grams': 10.0, 'substrate_weight_grams': 2.5,
+            'tumbler_volume': 9.0, 'is_control': False, 'chimera_channel': 3, 'in_service': True,
+            'notes': 'Cellulose',
+        },
+        {
+            'channel_number': 2, 'inoculum_weight_grams': 10.0, 'substrate_weight_grams': 0.0,
+            'tumbler_volume': 9.0, 'is_control': True, 'chimera_channel': None, 'in_service': True,
+            'notes': 'Control',
+        },
+    ]
+
+
+@pytest.mark.parametrize('delimiter', [';', '\t'])
+def test_other_delimiters(delimiter):
+    configurations = _parse([['4', 'Sludge', '1', '0', '1.5', '0', '9', '']], delimiter)
+
+    assert [(c['channel_number'], c['notes'], c['inoculum_weight_grams']) for c in configurations] == [(4, 'Sludge', 1.5)]
+
+
+def test_blank_lines_are_skipped_and_end_of_data_stops():
+    text = _csv_text([
+        ['1', 'A', '1', '0', '1', '1', '9', ''],
+        [],
+        ['', '', '', '', '', '', '', ''],
+        ['2', 'B', '1', '0', '1', '1', '9', ''],
+        ['', 'End of data', '', '', '', '', '', ''],
+        ['3', 'After the end', '1', '0', '1', '1', '9', ''],
+    ])
+
+    configurations = _parse_configuration_csv(io.StringIO(text, newline=''), ',')
+
+    assert [c['notes'] for c in configurations] == ['A', 'B']
+
+
+def test_blank_channel_numbers_count_up():
+    configurations = _parse([
+        ['', 'A', '1', '0', '1', '1', '9', ''],
+        ['', 'B', '1', '0', '1', '1', '9', ''],
+    ])
+
+    assert [c['channel_number'] for c in configurations] == [1, 2]
+
+
+def test_repeated_header_uses_last_column():
+    header = HEADER + ['Tumbler volume (ml)']
+
+    configurations = _parse([['1', 'A', '1', '0', '1', '1', '9', '', '11']], header=header)
+
+    assert configurations[0]['tumbler_volume'] == 11.0
+
+
+@pytest.mark.parametrize('values, expected', [
+    (['1', 'A', '', '0', '0', '0', '9', ''], True),
+    (['1', 'A', '', '0', '0', '0', '0', '2'], True),
+    (['1', 'A', '', '1', '0', '0', '0', ''], True),
+    (['1', 'A', '', '0', '0', '0', '0', ''], False),
+    (['1', 'A', 'no', '0', '5', '5', '9', ''], False),
+])
+def test_blank_in_service_is_inferred_from_values(values, expected):
+    assert _parse([values])[0]['in_service'] is expected
+
+
+def test_missing_required_header():
+    with pytest.raises(ValueError, match='Missing expected CSV header: in service'):
+        _parse([], header=[name for name in HEADER if name != 'In service'])
+
+
+@pytest.mark.parametrize('bad_row, message', [
+    (['1', 'B', '1', '0', 'lots', '1', '9', ''], 'Invalid data in row 3'),
+    (['1', 'B', 'maybe', '0', '1', '1', '9', ''], 'Invalid data in row 3: Invalid boolean value: maybe'),
+    (['1', 'B', '1', '0', '1', '1', '9', '16'], 'Invalid data in row 3: Channel number must be between 1 and 15'),
+])
+def test_error_reports_row_number(bad_row, message):
+    good = ['1', 'A', '1', '0', '1', '1', '9', '']
+    text = _csv_text([good, good, [], bad_row])
+
+    with pytest.raises(ValueError, match=message):
+        _parse_configuration_csv(io.StringIO(text, newline=''), ',')
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Empty parse cache, with every real parse recorded."""
+    monkeypatch.setattr(devices_tests, '_csv_parse_cache', OrderedDict())
+    monkeypatch.setattr(devices_tests, '_csv_parse_cache_rows', 0)
+    calls = []
+
+    def counting_parse(text_stream, delimiter):
+        calls.append(delimiter)
+        return _parse_configuration_csv(text_stream, delimiter)
+
+    monkeypatch.setattr(devices_tests, '_parse_configuration_csv', counting_parse)
+    return calls
+
+
+def _cached(digest, rows, delimiter=','):
+    return _parse_configuration_csv_cached(digest, io.StringIO(_csv_text(rows, delimiter), newline=''), delimiter)
+
+
+def test_cache_hits_by_digest_and_delimiter(parse_calls):
+    rows = [['1', 'A', '1', '0', '1', '1', '9', '']]
+
+    first = _cached(b'digest-a', rows)
+    assert _cached(b'digest-a', rows) is first
+    _cached(b'digest-a', rows, ';')
+    _cached(b'digest-b', rows)
+
+    assert parse_calls == [',', ';', ',']
+
+
+def test_cache_is_bounded_by_rows(parse_calls, monkeypatch):
+    monkeypatch.setattr(devices_tests, 'CSV_PARSE_CACHE_ROWS', 4)
+    two_rows = [['1', 'A', '1', '0', '1', '1', '9', ''], ['2', 'B', '1', '0', '1', '1', '9', '']]
+
+    _cached(b'first', two_rows)
+    _cached(b'second', two_rows)
+    _cached(b'third', two_rows)  # evicts 'first'
+
+    assert list(devices_tests._csv_parse_cache) == [(b'second', ','), (b'third', ',')]
+    assert devices_tests._csv_parse_cache_rows == 4
+
+    five_rows = [[str(n), 'X', '1', '0', '1', '1', '9', ''] for n in range(1, 6)]
+    _cached(b'too-big', five_rows)
+    _cached(b'too-big', five_rows)
+
+    assert parse_calls.count(',') == 5
+    assert (b'too-big', ',') not in devices_tests._csv_parse_cache
+
+
+def _upload(client, headers, content):
+    return client.post(
+        '/api/v1/tests/upload-csv',
+        data={'file': (io.BytesIO(content), 'config.csv')},
+        content_type='multipart/form-data',
+        headers=headers,
+    )
+
+
+def test_upload_strips_utf8_bom(client, auth_headers):
+    content = b'\xef\xbb\xbf' + _csv_text([['1', 'Café', '1', '0', '1', '1', '9', '']]).encode('utf-8')
+
+    response = _upload(client, auth_headers('operator'), content)
+
+    assert response.status_code == 200
+    assert [c['notes'] for c in response.get_json()['configurations']] == ['Café']
+
+
+def test_upload_falls_back_to_latin1(client, auth_headers):
+    content = _csv_text([['1', 'Café', '1', '0', '1', '1', '9', '']]).encode('latin-1')
+
+    response = _upload(client, auth_headers('operator'), content)
+
+    assert response.status_code == 200
+    assert [c['notes'] for c in response.get_json()['configurations']] == ['Café']
+
+
+def test_upload_sniffs_semicolons(client, auth_headers):
+    content = _csv_text([['1', 'A', '1', '0', '1.5', '0', '9', '']], ';').encode('utf-8')
+
+    response = _upload(client, auth_headers('operator'), content)
+
+    assert response.status_code == 200
+    assert response.get_json()['configurations'][0]['notes'] == 'A'
+
+
+def test_upload_reports_parse_errors(client, auth_headers):
+    content = _csv_text([['1', 'A', '1', '0', 'lots', '1', '9', '']]).encode('utf-8')
+
+    response = _upload(client, auth_headers('operator'), content)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Invalid data in row 1')
@@ -0,0 +1,45 @@
+from database.models import Device
+from device_manager import DeviceManager
+
+
+def _values(mac, name='Device'):
+    return dict(
+        name=name,
+        device_type='black-box',
+        serial_port='/dev/ttyUSB0',
+        mac_address=mac,
+        connected=False,
+        logging=False,
+    )
+
+
+def test_register_device_inserts_and_returns_id(db):
+    device_id = DeviceManager._register_device(**_values('AA:BB'))
+
+    assert device_id is not None
+    assert db.session.get(Device, device_id).mac_address == 'AA:BB'
+
+
+def test_register_device_returns_none_for_known_mac(db):
+    first_id = DeviceManager._register_device(**_values('AA:BB', 'First'))
+
+    assert DeviceManager._register_device(**_values('AA:BB', 'Second')) is None
+    assert db.session.query(Device).count() == 1
+    assert db.session.get(Device, first_id).name == 'First'
+
+
+def test_register_device_without_mac_never_conflicts(db):
+    first_id = DeviceManager._register_device(**_values(None))
+    second_id = DeviceManager._register_device(**_values(None))
+
+    assert None not in (first_id, second_id)
+    assert first_id != second_id
+
+
+def test_register_device_falls_back_to_flush_without_returning(db, monkeypatch):
+    monkeypatch.setattr(db.engine.dialect, 'insert_returning', False)
+
+    device_id = DeviceManager._register_device(**_values('AA:BB'))
+
+    assert device_id is not None
+    assert db.session.get(Device, device_id).mac_address == 'AA:BB'
@@ -0,0 +1,137 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask_sse import sse
+
+import routes.devices_tests as devices_tests
+
+WAIT_SECONDS = 5
+
+
+class FakeProbe:
+    """Stands in for the serial side of DeviceManager during a scan."""
+
+    def __init__(self, handlers, blocked_ports=()):
+        self.handlers = handlers  # port -> handler of a device that answers
+        self.blocked_ports = set(blocked_ports)
+        self.release = threading.Event()
+
+    def connect(self, port, device_name=None):
+        if port in self.blocked_ports:
+            # A port that hangs until the test lets it go
+            self.release.wait(WAIT_SECONDS)
+            return False
+        return port in self.handlers
+
+    def get_device_by_port(self, port):
+        return self.handlers.get(port)
+
+
+def _handler(device_id, device_type='black-box'):
+    return SimpleNamespace(id=device_id, device_name=f'Device {device_id}', device_type=device_type, is_logging=False)
+
+
+class PublishedEvents(list):
+    """(type, data) of each SSE event, with a flag set once the scan completes."""
+
+    def __init__(self):
+        super().__init__()
+        self.complete = threading.Event()
+
+    def publish(self, data, type=None, **kwargs):
+        self.append((type, data))
+        if type == 'discovery_complete':
+            self.complete.set()
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = PublishedEvents()
+    monkeypatch.setattr(sse, 'publish', events.publish)
+    return events
+
+
+@pytest.fixture
+def scan(monkeypatch, device_manager):
+    def _scan(handlers, ports=None, blocked_ports=()):
+        probe = FakeProbe(handlers, blocked_ports)
+        port_names = ports if ports is not None else [*handlers, *blocked_ports]
+        monkeypatch.setattr(devices_tests, 'probe_candidates', lambda: [SimpleNamespace(device=port) for port in port_names])
+        monkeypatch.setattr(device_manager, 'connect', probe.connect)
+        monkeypatch.setattr(device_manager, 'get_device_by_port', probe.get_device_by_port)
+        return probe
+    return _scan
+
+
+def test_sync_scan_returns_answering_devices(client, auth_headers, scan, published):
+    scan({'/dev/ttyUSB0': _handler(1), '/dev/ttyUSB1': _handler(2, 'chimera')}, ports=['/dev/ttyUSB0', '/dev/ttyUSB1', '/dev/ttyUSB2'])
+
+    response = client.get('/api/v1/devices/discover', headers=auth_headers('operator'))
+
+    assert response.status_code == 200
+    assert sorted(device['port'] for device in response.get_json()) == ['/dev/ttyUSB0', '/dev/ttyUSB1']
+    assert published == []
+
+
+def test_sync_scan_without_ports(client, auth_headers, scan, published):
+    scan({}, ports=[])
+
+    response = client.get('/api/v1/devices/discover', headers=auth_headers('operator'))
+
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+
+def test_async_scan_publishes_each_device_then_completion(client, auth_headers, scan, published):
+    scan({'/dev/ttyUSB0': _handler(1), '/dev/ttyUSB1': _handler(2, 'chimera')})
+
+    response = client.get('/api/v1/devices/discover?async=true', headers=auth_headers('operator'))
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['ports'] == 2
+    assert published.complete.wait(WAIT_SECONDS)
+
+    discovered = [data for event_type, data in published if event_type == 'device_discovered']
+    assert sorted(data['id'] for data in discovered) == [1, 2]
+    assert all(data['scan_id'] == body['scan_id'] for data in discovered)
+    assert discovered[0].keys() == {'scan_id', 'id', 'name', 'port', 'device_type', 'logging'}
+
+    event_type, data = published[-1]
+    assert event_type == 'discovery_complete'
+    assert data['scan_id'] == body['scan_id']
+    assert sorted(device['id'] for device in data['devices']) == [1, 2]
+
+
+def test_async_scan_without_ports_completes_immediately(client, auth_headers, scan, published):
+    scan({}, ports=[])
+
+    response = client.get('/api/v1/devices/discover?async=true', headers=auth_headers('operator'))
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['ports'] == 0
+    assert published == [('discovery_complete', {'scan_id': body['scan_id'], 'devices': []})]
+
+
+@pytest.mark.parametrize('async_mode', [False, True])
+def test_scan_timeout_returns_partial_result(client, auth_headers, scan, published, monkeypatch, async_mode):
+    monkeypatch.setattr(devices_tests, 'DISCOVER_SCAN_TIMEOUT_SECONDS', 0.5)
+    probe = scan({'/dev/ttyUSB0': _handler(1)}, blocked_ports=['/dev/ttyUSB9'])
+
+    try:
+        url = '/api/v1/devices/discover' + ('?async=true' if async_mode else '')
+        response = client.get(url, headers=auth_headers('operator'))
+
+        if async_mode:
+            assert response.status_code == 202
+            assert published.complete.wait(WAIT_SECONDS)
+            devices = published[-1][1]['devices']
+        else:
+            assert response.status_code == 200
+            devices = response.get_json()
+    finally:
+        probe.release.set()
+
+    assert [device['port'] for device in devices] == ['/dev/ttyUSB0']
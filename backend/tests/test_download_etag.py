@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import literal, select
+
+from database import models
+from database.models import BlackBoxEventLogData, BlackboxRawData, Device
+from routes.devices_tests import _export_timestamp_sql
+
+
+@pytest.fixture
+def setup(db, auth_headers):
+    test = models.Test(name='Run', date_created=datetime(2024, 5, 1))
+    device = Device(name='Box', device_type='black-box', serial_port='/dev/ttyUSB0')
+    other = Device(name='Spare', device_type='black-box', serial_port='/dev/ttyUSB1')
+    db.session.add_all([test, device, other])
+    db.session.commit()
+    _add_tip(db, test.id, device.id, 1)
+    return test.id, device.id, auth_headers('viewer')
+
+
+def _add_tip(db, test_id, device_id, tip_number):
+    db.session.add(BlackboxRawData(
+        test_id=test_id, device_id=device_id, tip_number=tip_number, channel_number=1,
+        timestamp=1714521600 + tip_number * 60, seconds_elapsed=tip_number * 60, temperature=35.0, pressure=1013.0,
+    ))
+    db.session.commit()
+
+
+def _download(client, headers, test_id, etag=None, query=''):
+    if etag:
+        headers = dict(headers, **{'If-None-Match': f'"{etag}"'})
+    return client.get(f'/api/v1/tests/{test_id}/download{query}', headers=headers)
+
+
+def _etag(client, headers, test_id, query=''):
+    response = _download(client, headers, test_id, query=query)
+    assert response.status_code == 200
+    return response.get_etag()[0]
+
+
+def test_unchanged_data_is_not_modified(client, db, setup):
+    test_id, _, headers = setup
+    etag = _etag(client, headers, test_id)
+
+    response = _download(client, headers, test_id, etag)
+
+    assert response.status_code == 304
+    assert response.get_etag()[0] == etag
+    assert response.data == b''
+
+
+def test_appended_row_changes_etag(client, db, setup):
+    test_id, device_id, headers = setup
+    etag = _etag(client, headers, test_id)
+
+    _add_tip(db, test_id, device_id, 2)
+
+    response = _download(client, headers, test_id, etag)
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag
+    assert response.data.count(b'\n') == 3
+
+
+def test_rolled_back_row_keeps_etag(client, db, setup):
+    test_id, device_id, headers = setup
+    etag = _etag(client, headers, test_id)
+
+    db.session.add(BlackboxRawData(test_id=test_id, device_id=device_id, tip_number=2, channel_number=1))
+    db.session.flush()
+    db.session.rollback()
+
+    assert _download(client, headers, test_id, etag).status_code == 304
+
+
+def test_rebuild_changes_etag(client, db, setup, auth_headers):
+    test_id, device_id, headers = setup
+    db.session.add(BlackBoxEventLogData(
+        test_id=test_id, device_id=device_id, channel_number=1, timestamp=1714521660, days=0, hours=0, minutes=1,
+        tumbler_volume=10, pressure=1013, cumulative_tips=1, volume_this_tip_stp=9, total_volume_stp=9,
+        tips_this_day=1, volume_this_day_stp=9, tips_this_hour=1, volume_this_hour_stp=9, net_volume_per_gram=0,
+    ))
+    db.session.commit()
+    etag = _etag(client, headers, test_id)
+
+    # Channel 1 leaves the configuration, so the rebuild writes no event rows back
+    response = client.post(
+        f'/api/v1/tests/{test_id}/configurations',
+        json={'configurations': [{'device_id': device_id, 'channel_number': 2, 'tumbler_volume': 10}]},
+        headers=auth_headers('operator'),
+    )
+
+    assert response.status_code == 201
+    assert db.session.query(BlackBoxEventLogData).count() == 0
+    assert _download(client, headers, test_id, etag).status_code == 200
+
+
+def test_device_rename_changes_etag(client, db, setup):
+    test_id, device_id, headers = setup
+    etag = _etag(client, headers, test_id)
+
+    db.session.get(Device, device_id).name = 'Renamed'
+    db.session.commit()
+
+    response = _download(client, headers, test_id, etag)
+    assert response.status_code == 200
+    assert b'Renamed' in response.data
+
+
+def test_other_device_rename_keeps_etag(client, db, setup):
+    test_id, _, headers = setup
+    etag = _etag(client, headers, test_id)
+
+    spare = Device.query.filter_by(name='Spare').one()
+    spare.name = 'Renamed'
+    spare.connected = True
+    db.session.commit()
+
+    assert _download(client, headers, test_id, etag).status_code == 304
+
+
+@pytest.mark.parametrize('user_values, query', [
+    ({'csv_delimiter': ';'}, ''),
+    ({'export_header_language': 'de'}, ''),
+    ({}, '?tz=Europe/Berlin'),
+])
+def test_formatting_choices_change_etag(client, db, setup, auth_headers, user_values, query):
+    test_id, _, headers = setup
+    etag = _etag(client, headers, test_id)
+    other_headers = auth_headers('operator', **user_values)
+
+    response = _download(client, other_headers, test_id, etag, query)
+
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag
+
+
+@pytest.mark.parametrize('epoch', [0, 951782400, 1714521600, 1714521659, 4102444799])
+def test_sql_timestamps_match_python_formatting(db, epoch):
+    formatted = db.session.scalar(select(_export_timestamp_sql(literal(epoch), 'sqlite', None, ' UTC')))
+
+    # The fallback format_ts in download_test_data
+    expected = datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S') + ' UTC'
+    assert formatted == expected
+
+
+def test_sql_timestamp_keeps_null(db):
+    assert db.session.scalar(select(_export_timestamp_sql(literal(None), 'sqlite', None, ' UTC'))) is None
@@ -0,0 +1,132 @@
+import pytest
+from flask import jsonify
+from sqlalchemy import insert, update
+
+from database import models
+from database.models import Device
+from utils.cache import cached_json, response_cache
+
+
+def _device(name='Device', mac=None):
+    return Device(name=name, device_type='black-box', serial_port='/dev/ttyUSB0', mac_address=mac)
+
+
+@pytest.fixture
+def view(db):
+    """A cached devices view that counts how often its body is built."""
+    calls = []
+
+    @cached_json(ttl=60, tables=('devices',))
+    def devices_view():
+        calls.append(1)
+        return jsonify(names=sorted(device.name for device in Device.query.all()))
+
+    devices_view.calls = calls
+    return devices_view
+
+
+def _get(app, view, path='/devices'):
+    with app.test_request_context(path):
+        return view().get_json()
+
+
+def test_hit_serves_cached_body(app, view):
+    assert _get(app, view) == {'names': []}
+    assert _get(app, view) == {'names': []}
+    assert len(view.calls) == 1
+
+
+def test_query_string_is_part_of_key(app, view):
+    _get(app, view, '/devices?page=1')
+    _get(app, view, '/devices?page=2')
+    _get(app, view, '/devices?page=1')
+
+    assert len(view.calls) == 2
+
+
+def test_committed_orm_write_invalidates(app, db, view):
+    _get(app, view)
+
+    db.session.add(_device('New'))
+    db.session.commit()
+
+    assert _get(app, view) == {'names': ['New']}
+    assert len(view.calls) == 2
+
+
+@pytest.mark.parametrize('statement', [
+    insert(Device).values(name='Bulk', device_type='black-box', serial_port='/dev/ttyUSB0'),
+    update(Device).values(name='Bulk'),
+])
+def test_committed_bulk_statement_invalidates(app, db, view, statement):
+    db.session.add(_device())
+    db.session.commit()
+    _get(app, view)
+
+    db.session.execute(statement)
+    db.session.commit()
+
+    assert 'Bulk' in _get(app, view)['names']
+    assert len(view.calls) == 2
+
+
+def test_rollback_does_not_invalidate(app, db, view):
+    _get(app, view)
+
+    db.session.add(_device('Discarded'))
+    db.session.flush()
+    db.session.execute(update(Device).values(name='Discarded too'))
+    db.session.rollback()
+
+    assert _get(app, view) == {'names': []}
+    assert len(view.calls) == 1
+
+
+def test_write_committed_while_building_is_not_cached(app, db):
+    calls = []
+
+    @cached_json(ttl=60, tables=('devices',))
+    def racing_view():
+        calls.append(1)
+        body = jsonify(count=Device.query.count())
+        if len(calls) == 1:
+            # Stands in for another request committing after the rows were read
+            db.session.add(_device())
+            db.session.commit()
+        return body
+
+    assert _get(app, racing_view) == {'count': 0}
+    assert _get(app, racing_view) == {'count': 1}
+    assert len(calls) == 2
+
+
+def test_set_skips_value_built_before_invalidation():
+    snapshot = response_cache.snapshot(('devices',))
+    response_cache.invalidate({'devices'})
+
+    response_cache.set('/snapshot-key', b'{}', 60, ('devices',), snapshot)
+
+    assert response_cache.get('/snapshot-key') is None
+
+
+def test_other_tables_do_not_invalidate(app, db, view):
+    _get(app, view)
+
+    db.session.add(models.Test(name='Unrelated'))
+    db.session.commit()
+
+    _get(app, view)
+    assert len(view.calls) == 1
+
+
+def test_core_connection_write_is_not_tracked(app, db, view):
+    # Documented gap: only the TTL bounds writes made outside the ORM session
+    db.session.add(_device('Device'))
+    db.session.commit()
+    _get(app, view)
+
+    with db.engine.begin() as connection:
+        connection.execute(update(Device.__table__).values(name='Renamed'))
+
+    assert _get(app, view) == {'names': ['Device']}
+    assert len(view.calls) == 1
@@ -0,0 +1,67 @@
+import pytest
+
+import routes.devices_tests as devices_tests
+from database.models import Sample
+
+URL = '/api/v1/samples/bulk'
+
+
+def _sample(name, **values):
+    return dict({'sample_name': name, 'substrate_source': 'Farm'}, **values)
+
+
+@pytest.fixture
+def headers(auth_headers):
+    return auth_headers('operator', username='bulk-author')
+
+
+@pytest.mark.parametrize('body', [[], {'sample_name': 'Not a list'}, 'text'])
+def test_rejects_empty_or_non_list_body(client, db, headers, body):
+    response = client.post(URL, json=body, headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Expected a non-empty JSON list of samples'
+
+
+def test_rejects_more_than_max(client, db, headers, monkeypatch):
+    monkeypatch.setattr(devices_tests, 'MAX_BULK_SAMPLES', 2)
+
+    response = client.post(URL, json=[_sample('A'), _sample('B'), _sample('C')], headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'At most 2 samples per request'
+    assert db.session.query(Sample).count() == 0
+
+
+@pytest.mark.parametrize('bad_item, message', [
+    ('not an object', 'Sample 1: expected an object'),
+    ({'substrate_source': 'Farm'}, 'Sample 1: sample_name is required'),
+    ({'sample_name': 'B'}, 'Sample 1: substrate_source is required'),
+    (_sample('B', ash_content='lots'), 'Sample 1: ash_content must be a number'),
+])
+def test_invalid_item_writes_nothing(client, db, headers, bad_item, message):
+    response = client.post(URL, json=[_sample('A'), bad_item, _sample('C')], headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == message
+    assert db.session.query(Sample).count() == 0
+
+
+def test_creates_all_samples(client, db, headers):
+    response = client.post(URL, json=[
+        _sample('A', ash_content='1.5', description='first'),
+        _sample('B', is_inoculum=True, c_content=''),
+    ], headers=headers)
+
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 2
+
+    samples = {sample.sample_name: sample for sample in db.session.query(Sample)}
+    assert samples['A'].ash_content == 1.5
+    assert samples['A'].description == 'first'
+    assert samples['A'].is_inoculum is False
+    assert samples['B'].is_inoculum is True
+    assert samples['B'].c_content is None
+    assert {sample.author for sample in samples.values()} == {'bulk-author'}
+    assert samples['A'].date_created is not None
+    assert samples['A'].date_created == samples['B'].date_created
@@ -0,0 +1,46 @@
+import pytest
+from flask_sse import sse
+
+from database.models import Device
+
+
+@pytest.fixture
+def checked_out_during_stream(db, monkeypatch):
+    """Patch the Redis subscription and record the pool state while streaming."""
+    seen = []
+
+    def fake_messages(channel='sse'):
+        seen.append(db.engine.pool.checkedout())
+        yield 'data:{}\n\n'
+
+    monkeypatch.setattr(sse, 'messages', fake_messages)
+    return seen
+
+
+def _connected_device(db, device_manager, device_type):
+    device = Device(name='Streamer', device_type=device_type, serial_port='/dev/ttyUSB0', connected=True)
+    db.session.add(device)
+    db.session.commit()
+    device_manager._active_handlers[device.id] = object()
+    return device.id
+
+
+def test_black_box_stream_holds_no_connection(client, db, device_manager, checked_out_during_stream):
+    device_id = _connected_device(db, device_manager, 'black-box')
+
+    response = client.get(f'/api/v1/black_box/{device_id}/stream')
+
+    assert response.status_code == 200
+    assert response.get_data() == b'data:{}\n\n'
+    assert checked_out_during_stream == [0]
+
+
+def test_chimera_stream_holds_no_connection(client, db, device_manager, auth_headers, checked_out_during_stream):
+    device_id = _connected_device(db, device_manager, 'chimera')
+    token = client.get('/api/v1/auth/stream-token', headers=auth_headers('viewer')).get_json()['stream_token']
+
+    response = client.get(f'/api/v1/chimera/{device_id}/stream?token={token}')
+
+    assert response.status_code == 200
+    assert response.get_data() == b'data:{}\n\n'
+    assert checked_out_during_stream == [0]
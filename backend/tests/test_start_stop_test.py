@@ -0,0 +1,254 @@
+import threading
+
+import pytest
+
+from database import models
+from database.models import (
+    ChannelConfiguration,
+    ChimeraChannelConfiguration,
+    ChimeraConfiguration,
+    Device,
+)
+
+WAIT_SECONDS = 5
+
+
+class FakeHandler:
+    """Stands in for a connected device's serial handler."""
+
+    def __init__(self, start_result=(True, 'Logging started'), stop_result=(True, 'Logging stopped')):
+        self.start_result = start_result
+        self.stop_result = stop_result
+        self.calls = []
+        self.test_id = None
+
+    def start_logging(self, filename):
+        self.calls.append(('start_logging', filename))
+        return self.start_result
+
+    def stop_logging(self):
+        self.calls.append(('stop_logging',))
+        return self.stop_result
+
+    def set_test_id(self, test_id):
+        self.test_id = test_id
+
+
+class FakeChimera(FakeHandler):
+    """A Chimera handler that records every configuration command."""
+
+    def __init__(self, service_result=(True, 'OK'), barrier=None, **kwargs):
+        super().__init__(**kwargs)
+        self.service_result = service_result
+        self.barrier = barrier
+
+    def get_timing(self):
+        if self.barrier:
+            # Only passes once every Chimera is being configured at the same time
+            self.barrier.wait(WAIT_SECONDS)
+        return True, {'channel_times_ms': [5000] * 15}, None
+
+    def set_all_timing(self, open_time_ms, flush_time_ms):
+        self.calls.append(('set_all_timing', open_time_ms, flush_time_ms))
+        return True, 'OK'
+
+    def set_service(self, service_sequence):
+        self.calls.append(('set_service', service_sequence))
+        return self.service_result
+
+    def set_channel_timing(self, channel_number, open_time_seconds):
+        self.calls.append(('set_channel_timing', channel_number, open_time_seconds))
+
+    def set_recirculate(self, mode):
+        self.calls.append(('set_recirculate', mode))
+
+    def set_recirculation_delay(self, seconds):
+        self.calls.append(('set_recirculation_delay', seconds))
+
+    def set_recirculation_duration(self, seconds):
+        self.calls.append(('set_recirculation_duration', seconds))
+
+
+@pytest.fixture
+def rig(db, device_manager, auth_headers):
+    """A test in setup plus helpers to attach connected devices to it."""
+
+    class Rig:
+        def __init__(self):
+            self.test = models.Test(name='Digest Run')
+            db.session.add(self.test)
+            db.session.commit()
+            self.headers = auth_headers('operator')
+
+        def add_device(self, name, device_type, handler, in_service=True):
+            device = Device(name=name, device_type=device_type, serial_port=f'/dev/{name}', connected=True)
+            db.session.add(device)
+            db.session.flush()
+            if device_type == 'black-box':
+                db.session.add(ChannelConfiguration(
+                    test_id=self.test.id, device_id=device.id, channel_number=1, in_service=in_service,
+                    inoculum_weight_grams=1, tumbler_volume=10,
+                ))
+            db.session.commit()
+            if handler is not None:
+                device_manager._active_handlers[device.id] = handler
+            return device.id
+
+        def add_chimera_config(self, device_id, open_times=(), **values):
+            config = ChimeraConfiguration(test_id=self.test.id, device_id=device_id, **values)
+            db.session.add(config)
+            db.session.flush()
+            db.session.add_all(
+                ChimeraChannelConfiguration(chimera_config_id=config.id, channel_number=number, open_time_seconds=seconds)
+                for number, seconds in open_times
+            )
+            db.session.commit()
+
+    return Rig()
+
+
+def _start(client, rig, device_ids):
+    return client.post(f'/api/v1/tests/{rig.test.id}/start', json={'device_ids': device_ids}, headers=rig.headers)
+
+
+def _device_rows(db):
+    db.session.expire_all()
+    return {device.name: (device.active_test_id, device.logging) for device in Device.query}
+
+
+def test_chimeras_are_configured_concurrently(client, db, rig):
+    barrier = threading.Barrier(2)
+    first, second = FakeChimera(barrier=barrier), FakeChimera(barrier=barrier)
+    first_id = rig.add_device('ChimeraA', 'chimera', first)
+    second_id = rig.add_device('ChimeraB', 'chimera', second)
+    rig.add_chimera_config(first_id, open_times=[(1, 12.0), (2, 8.0)], flush_time_seconds=45, service_sequence='110000000000000')
+    rig.add_chimera_config(second_id, service_sequence='100000000000000')
+
+    response = _start(client, rig, [first_id, second_id])
+
+    assert response.status_code == 200
+    assert not barrier.broken
+    assert first.calls[:5] == [
+        ('set_all_timing', 5000, 45000),
+        ('set_service', '110000000000000'),
+        ('set_channel_timing', 1, 12.0),
+        ('set_channel_timing', 2, 8.0),
+        ('set_recirculate', 0),
+    ]
+    assert second.calls[:3] == [('set_all_timing', 5000, 30000), ('set_service', '100000000000000'), ('set_recirculate', 0)]
+
+
+def test_chimera_max_gets_periodic_recirculation(client, db, rig, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'CHIMERA_DEVICE_MODEL', 'chimera-max')
+    chimera = FakeChimera()
+    device_id = rig.add_device('ChimeraMax', 'chimera-max', chimera)
+    rig.add_chimera_config(
+        device_id, recirculation_mode='periodic', recirculation_delay_seconds=3600, recirculation_duration_seconds=60,
+    )
+
+    response = _start(client, rig, [device_id])
+
+    assert response.status_code == 200
+    assert [call for call in chimera.calls if call[0].startswith('set_recirculat')] == [
+        ('set_recirculate', 1),
+        ('set_recirculation_delay', 3600),
+        ('set_recirculation_duration', 60),
+    ]
+
+
+def test_rejected_chimera_setting_fails_start(client, db, rig):
+    good, bad = FakeChimera(), FakeChimera(service_result=(False, 'NAK'))
+    good_id = rig.add_device('ChimeraA', 'chimera', good)
+    bad_id = rig.add_device('ChimeraB', 'chimera', bad)
+    rig.add_chimera_config(good_id)
+    rig.add_chimera_config(bad_id)
+
+    response = _start(client, rig, [good_id, bad_id])
+
+    assert response.status_code == 500
+    assert response.get_json()['error'] == 'Failed to configure Chimera service sequence on ChimeraB: NAK'
+    assert not any(call[0] == 'start_logging' for call in good.calls + bad.calls)
+    db.session.expire_all()
+    assert db.session.get(models.Test, rig.test.id).status == 'setup'
+    assert _device_rows(db) == {'ChimeraA': (None, False), 'ChimeraB': (None, False)}
+
+
+def test_start_marks_only_selected_devices(client, db, rig):
+    box, plc = FakeHandler(), FakeHandler()
+    box_id = rig.add_device('Box A', 'black-box', box)
+    plc_id = rig.add_device('Plc', 'plc', plc)
+    rig.add_device('Idle', 'black-box', FakeHandler())
+
+    response = _start(client, rig, [box_id, plc_id])
+
+    assert response.status_code == 200
+    [result] = response.get_json()['logging_results']
+    assert result['device'] == 'Box A'
+    assert result['filename'].startswith('Digest_R_Box_A_') and len(result['filename']) <= 20
+    assert box.calls == [('start_logging', result['filename'])]
+    # Device types that don't log to a file join the test without a start command
+    assert plc.calls == []
+    assert box.test_id == plc.test_id == rig.test.id
+    assert _device_rows(db) == {'Box A': (rig.test.id, True), 'Plc': (rig.test.id, True), 'Idle': (None, False)}
+    assert db.session.get(models.Test, rig.test.id).status == 'running'
+
+
+def test_start_failure_stops_started_devices(client, db, rig):
+    good, bad = FakeHandler(), FakeHandler(start_result=(False, 'SD card error'))
+    good_id = rig.add_device('Box A', 'black-box', good)
+    bad_id = rig.add_device('Box B', 'black-box', bad)
+
+    response = _start(client, rig, [good_id, bad_id])
+
+    assert response.status_code == 500
+    assert response.get_json()['error'] == (
+        'Failed to start logging on Box B: SD card error. Any devices already started were stopped.'
+    )
+    assert good.calls[-1] == ('stop_logging',)
+    assert ('stop_logging',) not in bad.calls
+    assert good.test_id is None and bad.test_id is None
+    assert _device_rows(db) == {'Box A': (None, False), 'Box B': (None, False)}
+    assert db.session.get(models.Test, rig.test.id).status == 'setup'
+
+
+def test_start_without_handler_starts_nothing(client, db, rig):
+    box = FakeHandler()
+    box_id = rig.add_device('Box A', 'black-box', box)
+    orphan_id = rig.add_device('Orphan', 'plc', None)
+
+    response = _start(client, rig, [box_id, orphan_id])
+
+    assert response.status_code == 500
+    assert response.get_json()['error'] == 'Handler not found for device Orphan. No devices were started.'
+    assert box.calls == []
+    assert _device_rows(db) == {'Box A': (None, False), 'Orphan': (None, False)}
+    assert db.session.get(models.Test, rig.test.id).status == 'setup'
+
+
+def test_stop_clears_every_device_in_the_test(client, db, rig):
+    box = FakeHandler(stop_result=(False, 'No response'))
+    box_id = rig.add_device('Box A', 'black-box', box)
+    orphan_id = rig.add_device('Orphan', 'plc', None)
+    other_test = models.Test(name='Other', status='running')
+    db.session.add(other_test)
+    db.session.flush()
+    rig.add_device('Elsewhere', 'black-box', FakeHandler())
+    db.session.query(Device).filter(Device.id.in_([box_id, orphan_id])).update(
+        {'active_test_id': rig.test.id, 'logging': True}, synchronize_session=False
+    )
+    db.session.query(Device).filter_by(name='Elsewhere').update({'active_test_id': other_test.id, 'logging': True})
+    rig.test.status = 'running'
+    db.session.commit()
+    box.test_id = rig.test.id
+
+    response = client.post(f'/api/v1/tests/{rig.test.id}/stop', headers=rig.headers)
+
+    assert response.status_code == 200
+    results = {result['device']: result for result in response.get_json()['stop_results']}
+    assert results['Box A'] == {'device': 'Box A', 'success': False, 'message': 'No response'}
+    assert results['Orphan']['success'] is False
+    assert results['Orphan']['message'] == 'Device handler unavailable; marked as stopped in database'
+    assert box.calls == [('stop_logging',)]
+    assert box.test_id is None
+    assert _device_rows(db) == {'Box A': (None, False), 'Orphan': (None, False), 'Elsewhere': (other_test.id, True)}
+    assert db.session.get(models.Test, rig.test.id).status == 'completed'
@@ -33,7 +33,7 @@ def require_role(allowed_roles):
             user_id = get_jwt_identity()
 
             # Import here to avoid circular imports
-            from database.models import User
+            from database.models import db, User
 
             # Ensure user_id is an integer (flask-jwt-extended may return string)
             try:
@@ -41,7 +41,7 @@ def require_role(allowed_roles):
             except (ValueError, TypeError):
                 return jsonify({"error": "Invalid user identity"}), 401
 
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return jsonify({"error": "User not found"}), 401
 
@@ -74,7 +74,7 @@ def require_minimum_role(minimum_role):
             verify_jwt_in_request()
             user_id = get_jwt_identity()
 
-            from database.models import User
+            from database.models import db, User
 
             # Ensure user_id is an integer
             try:
@@ -82,7 +82,7 @@ def require_minimum_role(minimum_role):
             except (ValueError, TypeError):
                 return jsonify({"error": "Invalid user identity"}), 401
 
-            user = User.query.get(user_id)
+            user = db.session.get(User, user_id)
             if not user:
                 return jsonify({"error": "User not found"}), 401
 
@@ -128,14 +128,14 @@ def get_current_user():
     Returns:
         User object or None
     """
-    from database.models import User
+    from database.models import db, User
 
     try:
         user_id = get_jwt_identity()
         if user_id:
             # Ensure user_id is an integer
             user_id = int(user_id)
-            return User.query.get(user_id)
+            return db.session.get(User, user_id)
     except:
         pass
     return None
@@ -0,0 +1,127 @@
+"""In-process response cache for read-heavy JSON endpoints.
+
+Deliberately dependency-free, like utils/rate_limit.py: the app runs as a
+single gunicorn worker (see start.sh -w 1), so per-process state is coherent.
+Entries are tagged with the tables they were built from and dropped as soon
+as an ORM session commit writes to one of those tables: flushed objects and
+ORM update()/insert()/delete() statements on mapped classes, including writes
+made by DeviceManager and the handler threads.
+
+Writes the session never sees as ORM writes are not tracked, and only the TTL
+bounds how long they go unnoticed:
+- Core statements run on a Connection, e.g. Device.mark_all_disconnected()
+  given a connection from db.engine.begin();
+- statements against a Table rather than a mapped class;
+- text() SQL.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class ResponseCache:
+    def __init__(self):
+        self._entries = {}  # key -> (expires_at, tables, body)
+        self._generations = {}  # table name -> invalidation counter
+        self._lock = threading.Lock()
+
+    def snapshot(self, tables):
+        """Capture the invalidation state of `tables` before building a value."""
+        with self._lock:
+            return tuple(self._generations.get(table, 0) for table in tables)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[2]
+
+    def set(self, key, body, ttl, tables, snapshot):
+        """Store `body` unless one of `tables` was invalidated since `snapshot`.
+
+        Without the snapshot check, a request that read the old rows could
+        repopulate the cache right after a concurrent commit invalidated it.
+        """
+        with self._lock:
+            if tuple(self._generations.get(table, 0) for table in tables) != snapshot:
+                return
+            self._entries[key] = (time.monotonic() + ttl, frozenset(tables), body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._entries = {
+                key: entry for key, entry in self._entries.items()
+                if entry[1].isdisjoint(tables)
+            }
+
+
+response_cache = ResponseCache()
+
+
+def cached_json(ttl, tables):
+    """Cache a view's 200 JSON body per URL until one of `tables` changes.
+
+    Apply below @jwt_required() so authentication still runs on every hit.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = request.full_path
+            body = response_cache.get(key)
+            if body is not None:
+                return current_app.response_class(body, mimetype='application/json')
+
+            snapshot = response_cache.snapshot(tables)
+            response = current_app.make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and response.is_json:
+                response_cache.set(key, response.get_data(), ttl, tables, snapshot)
+            return response
+        return wrapper
+    return decorator
+
+
+def _changed_tables(session):
+    return session.info.setdefault('changed_tables', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_tables(session, flush_context):
+    # new/dirty/deleted still describe the pre-flush state here
+    changed = _changed_tables(session)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        changed.add(obj.__table__.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_writes(orm_execute_state):
+    # Query.update()/delete() and update()/insert() statements skip the flush
+    if orm_execute_state.is_select or orm_execute_state.bind_mapper is None:
+        return
+    _changed_tables(orm_execute_state.session).add(orm_execute_state.bind_mapper.local_table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_tables(session):
+    changed = session.info.pop('changed_tables', None)
+    if changed:
+        response_cache.invalidate(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_tables(session):
+    session.info.pop('changed_tables', None)
@@ -0,0 +1,51 @@
+"""orjson-backed JSON provider for Flask.
+
+jsonify() spends most of its time in the stdlib encoder on list endpoints
+(devices, samples, tests, connected devices). orjson encodes straight to
+UTF-8 bytes in C. Output stays compatible with Flask's DefaultJSONProvider:
+keys are sorted, datetimes still go through Flask's `default` (HTTP dates),
+and anything orjson rejects (e.g. ints beyond 64 bits) falls back to the
+stdlib implementation, for both encoding and request-body parsing.
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    _OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    def _dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS)
+
+    def dumps(self, obj, **kwargs):
+        # Explicit options (indent, cls, ...) are left to the stdlib encoder
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._dumps_bytes(obj).decode()
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        # Request bodies (request.get_json) are parsed here too. orjson is
+        # stricter than the stdlib (no NaN/Infinity, 64-bit ints), so inputs
+        # it rejects get a second chance with the default parser.
+        if kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return super().loads(s)
+
+    def response(self, *args, **kwargs):
+        # Debug mode pretty-prints, which orjson can't match exactly
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = self._dumps_bytes(obj)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
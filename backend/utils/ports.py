@@ -0,0 +1,76 @@
+"""Short-lived cache around serial port enumeration, plus the shared probe pool.
+
+`serial.tools.list_ports.comports()` walks sysfs/udev on Linux (SetupDi and
+the registry on Windows) on every call. The ports endpoint, device discovery
+and the auto-connect scanner all enumerate, often within the same second, so
+they share one result that is refreshed at most once per TTL.
+"""
+
+import concurrent.futures
+import threading
+import time
+
+import serial.tools.list_ports
+
+PORTS_TTL_SECONDS = 1.0
+
+# DeviceManager.connect serializes probes on its class lock, so a handful of
+# threads keeps the queue full; more would only park on the lock.
+PROBE_WORKERS = 4
+
+_ports_cache = {'ts': None, 'val': [], 'candidates': []}
+_ports_lock = threading.Lock()
+_probe_executor = None
+
+
+# Lower-cased markers of Bluetooth SPP links in a port's name or description.
+# Windows labels the inbound half of a paired device "Incoming"; some stacks
+# only say "BT Port".
+BLUETOOTH_MARKERS = ('bluetooth', 'bt port', 'incoming')
+
+
+def _is_bluetooth(port_info):
+    # Drivers disagree on case ("Bluetooth", "BLUETOOTH", "bluetooth")
+    label = f'{port_info.device} {port_info.description or ""}'.lower()
+    return any(marker in label for marker in BLUETOOTH_MARKERS)
+
+
+def _refresh(ttl):
+    now = time.monotonic()
+    if _ports_cache['ts'] is None or now - _ports_cache['ts'] > ttl:
+        ports = list(serial.tools.list_ports.comports())
+        _ports_cache['val'] = ports
+        _ports_cache['candidates'] = [p for p in ports if not _is_bluetooth(p)]
+        _ports_cache['ts'] = now
+
+
+def cached_comports(ttl=PORTS_TTL_SECONDS):
+    """Return all serial ports, re-enumerating at most once per `ttl` seconds.
+
+    The returned list is shared between callers and must not be mutated.
+    """
+    with _ports_lock:
+        _refresh(ttl)
+        return _ports_cache['val']
+
+
+def probe_candidates(ttl=PORTS_TTL_SECONDS):
+    """Return the cached ports that are worth probing for a device.
+
+    Bluetooth serial links block for a long time when opened, so they are
+    filtered out once per enumeration instead of once per probe.
+    """
+    with _ports_lock:
+        _refresh(ttl)
+        return _ports_cache['candidates']
+
+
+def probe_executor():
+    """Return the thread pool shared by the auto-connect scanner and the
+    discover endpoint, created on first use."""
+    global _probe_executor
+    with _ports_lock:
+        if _probe_executor is None:
+            _probe_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=PROBE_WORKERS, thread_name_prefix='port-probe')
+        return _probe_executor
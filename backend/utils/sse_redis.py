@@ -0,0 +1,40 @@
+"""One Redis connection pool for every flask-sse publish and subscription.
+
+flask-sse's `redis` property calls `StrictRedis.from_url()` on each access,
+which builds a brand-new client *and* connection pool, so every
+`sse.publish()` from a handler thread opened (and later dropped) its own TCP
+connection to Redis. Handlers publish on every tip and gas reading, so the
+client is now created once per URL and shared.
+"""
+
+import threading
+
+import redis
+from flask import current_app
+from flask_sse import ServerSentEventsBlueprint
+
+_clients = {}  # redis url -> client backed by a shared ConnectionPool
+_clients_lock = threading.Lock()
+
+
+def _shared_redis(blueprint):
+    # Same URL resolution as flask-sse itself
+    redis_url = current_app.config.get('SSE_REDIS_URL') or current_app.config.get('REDIS_URL')
+    if not redis_url:
+        raise KeyError("Must set a redis connection URL in app config.")
+
+    client = _clients.get(redis_url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(redis_url)
+            if client is None:
+                # No max_connections: each open /stream subscription holds a
+                # connection for its lifetime, so a cap would refuse streams.
+                pool = redis.ConnectionPool.from_url(redis_url)
+                client = _clients[redis_url] = redis.StrictRedis(connection_pool=pool)
+    return client
+
+
+def use_shared_redis_pool():
+    """Point flask-sse's `redis` property at the shared per-URL client."""
+    ServerSentEventsBlueprint.redis = property(_shared_redis)
@@ -332,9 +332,10 @@ function Dashboard({ onViewPlot }) {
   const discoverDevices = async () => {
     setLoading(true)
     try {
-      const response = await authFetch('/api/v1/devices/discover')
+      // The scan runs in the background; devices show up through the
+      // device_status / discovery_complete events on /stream.
+      const response = await authFetch('/api/v1/devices/discover?async=true')
       if (response.ok) {
-        // After discovery, reload all data
         sessionStorage.setItem('discoveryCompleted', 'true')
         await loadData()
       } else {
@@ -471,6 +472,7 @@ function Dashboard({ onViewPlot }) {
     let source = null
     let streamStopped = false
     let reconnectTimer = null
+    let statusRefreshTimer = null
 
     const connectStream = async () => {
       try {
@@ -516,6 +518,18 @@ function Dashboard({ onViewPlot }) {
       setGasEventsByChannel(prev => buildGasChannelMap([newEvent], prev));
     });
 
+    // Devices connecting/disconnecting are pushed by the backend; coalesce
+    // bursts (e.g. during a port scan) into a single refresh.
+    source.addEventListener('device_status', () => {
+      clearTimeout(statusRefreshTimer)
+      statusRefreshTimer = setTimeout(loadData, 500)
+    });
+
+    source.addEventListener('discovery_complete', () => {
+      clearTimeout(statusRefreshTimer)
+      loadData()
+    });
+
     source.onerror = (e) => {
       console.error("SSE Error:", e);
       source.close();
@@ -533,6 +547,7 @@ function Dashboard({ onViewPlot }) {
       streamStopped = true
       clearInterval(interval);
       clearTimeout(reconnectTimer)
+      clearTimeout(statusRefreshTimer)
       if (source) source.close();
     }
   }, [])